@@ -2,16 +2,23 @@
 queries and returns both the raw documents and the model response.
 
 This file keeps a CLI-friendly behavior when executed directly.
+
+The Azure Search and OpenAI SDKs are imported on first use (see ``_load_sdk``)
+so importing this module stays cheap for the Streamlit cold start.
 """
 
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
-from azure.core.exceptions import HttpResponseError, ClientAuthenticationError
-from openai import AzureOpenAI
+from concurrent.futures import Future, ThreadPoolExecutor
 import os
+import re
 import sys
+import threading
+import time
 from dotenv import load_dotenv
-from typing import List, Tuple, Any
+from context_sizing import ADAPTIVE_MAX_DOCS, LATENCY_TARGET_SECONDS, plan_context, relevant_count
+from requirement_index import REQUIREMENT_DOC_CANDIDATES, rank_requirements, requirement_filter
+from rerank import rerank as rerank_documents
+from singleflight import SingleFlight, fingerprint
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 load_dotenv()
 
@@ -23,6 +30,44 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_DEPLOYMENT_MODEL = os.getenv("AZURE_DEPLOYMENT_MODEL")
 INDEX_NAME = os.getenv("AZURE_SEARCH_INDEX", "rfp-syryu-obj")
 
+# Speculative prefetch of the default analysis (opt-in; default of the UI checkbox)
+SPECULATIVE_PREFETCH = os.getenv("RFP_SPECULATIVE_PREFETCH", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_MAX_INFLIGHT = int(os.getenv("RFP_SPECULATIVE_MAX_INFLIGHT", "2"))
+SPECULATIVE_TTL_SECONDS = 600
+
+# Fields retrieved by search
+DEFAULT_SELECT = "projectName,functionalRequirements,nonFunctionalRequirements,technicalRequirements,importance,skillsets,chunk"
+# Reranking over-fetches only short fields plus highlight snippets of the long
+# ones; full documents are loaded for the chosen few afterwards
+CANDIDATE_SELECT = "id,projectName,importance,skillsets"
+CANDIDATE_HIGHLIGHT_FIELDS = "chunk,functionalRequirements,nonFunctionalRequirements,technicalRequirements"
+# Fields needed to flatten requirement records (see requirement_index.py)
+REQUIREMENT_SELECT = "id,projectName,fileName,requirements"
+# Candidate pool size when reranking locally
+RERANK_CANDIDATES = int(os.getenv("RFP_RERANK_CANDIDATES", "40"))
+
+# Per-attempt upstream timeouts (seconds) and retry counts. Single-flight
+# followers wait as long as the leader can take with all its retries, so a
+# hung call fails for every waiter instead of leaving the leader running on.
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("RFP_SEARCH_TIMEOUT", "30"))
+SEARCH_MAX_RETRIES = int(os.getenv("RFP_SEARCH_MAX_RETRIES", "1"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("RFP_LLM_TIMEOUT", "90"))
+LLM_MAX_RETRIES = int(os.getenv("RFP_LLM_MAX_RETRIES", "1"))
+# Upper bound of the SDKs' backoff between attempts
+RETRY_BACKOFF_MAX_SECONDS = 8.0
+
+
+def _leader_budget(timeout: float, retries: int) -> float:
+    """Longest time one upstream call can take including retries and backoff."""
+    return timeout * (retries + 1) + RETRY_BACKOFF_MAX_SECONDS * retries
+
+
+SEARCH_WAIT_SECONDS = _leader_budget(SEARCH_TIMEOUT_SECONDS, SEARCH_MAX_RETRIES)
+LLM_WAIT_SECONDS = _leader_budget(LLM_TIMEOUT_SECONDS, LLM_MAX_RETRIES)
+
+# Background client warm-up after the first UI render
+DISABLE_WARMUP = os.getenv("RFP_DISABLE_WARMUP", "false").lower() in ("1", "true", "yes")
+
 
 GROUNDED_PROMPT = """
 당신은 RFP 문서를 분석하고 요구사항을 추출하는 전문가입니다.
@@ -34,17 +79,210 @@ Query: {query}
 Sources:\n{sources}
 """
 
+# Default Pre-ORB extraction prompt shown in the UI and used for speculative prefetch
+DEFAULT_ANALYSIS_PROMPT = (
+    "RFP 문서를 참고해서 아래 항목에 맞는 내용을 요약해주세요."
+    "사업명, 사업기간, 사업목적/범위, "
+    "핵심 기술, 고객사명, 사업 주관 담당자, 사업 주관 조직, 사업설명회 일자, 입찰 일자, PT발표일, 우선협상 대상자 선정 발표일, "
+    "주요 체크사항을 알려주세요. 단, 해당항목이 없을 경우에는 내용 없음으로 답변해주세요."
+    "출력은 반드시 요청한 항목명과 그에 상응하는 값만을 포함하도록 해주세요."
+)
+
+
+def extract_chunks(documents: List[Any], max_chars: Optional[int] = None) -> List[Any]:
+    """Return the ``chunk`` texts of search documents, optionally cut to ``max_chars``.
+
+    This is the document selection the UI sends to the model by default, so the
+    speculative prefetch and the UI must build it the same way.
+    """
+    chunks = [doc["chunk"] for doc in documents if isinstance(doc, dict) and "chunk" in doc]
+    if max_chars:
+        chunks = [chunk[:max_chars] if isinstance(chunk, str) else chunk for chunk in chunks]
+    return chunks
+
+
+class SpeculativeAnalysis:
+    """Process-wide registry of speculative default-prompt generations.
+
+    At most one job is kept per owner (a UI session). Starting a new job or
+    claiming with a different prompt/selection discards the previous one, and
+    no more than ``max_inflight`` jobs run at once so wasted quota is bounded.
+    Running model calls cannot be interrupted; discarded results are dropped.
+    """
+
+    def __init__(self, max_inflight: int = SPECULATIVE_MAX_INFLIGHT, ttl: float = SPECULATIVE_TTL_SECONDS):
+        self.max_inflight = max(1, max_inflight)
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix="rfp-speculative")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Tuple[str, Future, float]] = {}
+        self.stats = {"started": 0, "skipped": 0, "hits": 0, "discarded": 0}
+
+    def start(self, owner: str, documents: List[Any], prompt: str,
+              generate: Callable[[List[Any], str], str]) -> Optional[Future]:
+        """Start generating in the background unless the concurrency cap is reached."""
+        key = fingerprint(prompt, documents)
+        with self._lock:
+            self._prune_locked()
+            current = self._jobs.get(owner)
+            if current and current[0] == key:
+                return current[1]
+            self._discard_locked(owner)
+
+            inflight = sum(1 for _, future, _ in self._jobs.values() if not future.done())
+            if inflight >= self.max_inflight:
+                self.stats["skipped"] += 1
+                return None
+
+            future = self._executor.submit(generate, list(documents), prompt)
+            self._jobs[owner] = (key, future, time.monotonic())
+            self.stats["started"] += 1
+            return future
+
+    def claim(self, owner: str, documents: List[Any], prompt: str) -> Optional[Future]:
+        """Return the owner's in-flight or finished job if it matches, else discard it."""
+        key = fingerprint(prompt, documents)
+        with self._lock:
+            current = self._jobs.pop(owner, None)
+            if current is None:
+                return None
+            if current[0] != key:
+                current[1].cancel()
+                self.stats["discarded"] += 1
+                return None
+            self.stats["hits"] += 1
+            return current[1]
+
+    def discard(self, owner: str) -> None:
+        with self._lock:
+            self._discard_locked(owner)
+
+    def _discard_locked(self, owner: str) -> None:
+        current = self._jobs.pop(owner, None)
+        if current is not None:
+            current[1].cancel()
+            self.stats["discarded"] += 1
+
+    def _prune_locked(self) -> None:
+        # Drop finished results nobody claimed (e.g. the session went away)
+        now = time.monotonic()
+        for owner, (_, future, started) in list(self._jobs.items()):
+            if future.done() and now - started > self.ttl:
+                del self._jobs[owner]
+
+
+_speculation = SpeculativeAnalysis()
+
+
+def _load_sdk():
+    """Import the Azure Search and OpenAI SDKs on first use; they dominate cold start."""
+    from azure.search.documents import SearchClient
+    from azure.core.credentials import AzureKeyCredential
+    from azure.core.exceptions import HttpResponseError, ClientAuthenticationError
+    from openai import AzureOpenAI
+
+    return SearchClient, AzureKeyCredential, HttpResponseError, ClientAuthenticationError, AzureOpenAI
+
+
+# Azure Search / OpenAI clients shared by every analyzer in the process; the
+# SDK clients are thread-safe and expensive to build (HTTP pools, auth setup)
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_clients(index_name: str) -> Tuple[Any, Any]:
+    """Return the process-wide ``(search_client, openai_client)`` for ``index_name``."""
+    SearchClient, AzureKeyCredential, _, _, AzureOpenAI = _load_sdk()
+    with _clients_lock:
+        if "openai" not in _clients:
+            _clients["openai"] = AzureOpenAI(
+                api_version="2023-12-01-preview",
+                azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                api_key=AZURE_OPENAI_API_KEY,
+                max_retries=LLM_MAX_RETRIES,
+            )
+        search_key = f"search:{index_name}"
+        if search_key not in _clients:
+            _clients[search_key] = SearchClient(
+                endpoint=AZURE_SEARCH_ENDPOINT,
+                index_name=index_name,
+                credential=AzureKeyCredential(AZURE_SEARCH_API_KEY),
+                retry_total=SEARCH_MAX_RETRIES,
+                retry_backoff_max=RETRY_BACKOFF_MAX_SECONDS,
+            )  # type: ignore
+        return _clients[search_key], _clients["openai"]
+
+
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+
+def warm_up() -> Optional[threading.Thread]:
+    """Import the SDKs and build the shared clients on a background thread, once per process.
+
+    The UI calls this after its first render so the first search does not pay
+    the SDK import and client construction cost; later analyzers reuse the clients.
+    """
+    global _warm_up_started
+    if DISABLE_WARMUP:
+        return None
+    with _warm_up_lock:
+        if _warm_up_started:
+            return None
+        _warm_up_started = True
+
+    def _run():
+        _load_sdk()
+        try:
+            RFPAnalyzer()
+        except Exception:
+            pass  # configuration errors are reported on first real use
+
+    thread = threading.Thread(target=_run, name="rfp-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def discard_speculation(session_id: str) -> None:
+    """Drop any speculative analysis held for ``session_id``."""
+    _speculation.discard(session_id)
+
+
+# Identical concurrent search / generation calls share one upstream request
+_singleflight = SingleFlight()
+
+
+_HIGHLIGHT_TAG_RE = re.compile(r"</?em>")
+
+
+def _normalize(text: str, casefold: bool = False) -> str:
+    text = re.sub(r"\s+", " ", text or "").strip()
+    return text.casefold() if casefold else text
+
+
+def request_stats() -> Dict[str, Dict[str, int]]:
+    """Counters for request coalescing and speculative prefetch."""
+    return {"singleflight": _singleflight.stats(), "speculative": dict(_speculation.stats)}
+
 
 class RFPAnalyzer:
-    """Initializes Azure Search and Azure OpenAI clients and provides a single
+    """Uses the process-wide Azure Search and Azure OpenAI clients and provides a single
     entry point to search the index and generate a grounded response.
 
     Methods
     -------
     search_and_generate(query, top=5) -> (documents_list, response_text)
+
+    With ``speculative=True`` every ``search`` starts generating the default
+    analysis prompt over the default selection in the background, and a later
+    matching ``generate_from_documents`` call for the same ``session_id``
+    picks up that result instead of calling the model again. It is off by
+    default so batch jobs and CLIs never start analyses nobody claims; the UI
+    turns it on per session (``RFP_SPECULATIVE_PREFETCH`` sets its checkbox).
     """
 
-    def __init__(self, *, index_name: str = INDEX_NAME, model: str = AZURE_DEPLOYMENT_MODEL):
+    def __init__(self, *, index_name: str = INDEX_NAME, model: str = AZURE_DEPLOYMENT_MODEL,
+                 speculative: bool = False, session_id: str = "default"):
         # Validate minimal env
         if not AZURE_SEARCH_API_KEY or not AZURE_SEARCH_ENDPOINT:
             raise ValueError("Missing Azure Search configuration in environment variables")
@@ -52,21 +290,17 @@ class RFPAnalyzer:
         if not AZURE_OPENAI_API_KEY or not AZURE_OPENAI_ENDPOINT or not model:
             raise ValueError("Missing Azure OpenAI configuration in environment variables")
 
-        try:
-            self.search_credential = AzureKeyCredential(AZURE_SEARCH_API_KEY)
-            self.openai_client = AzureOpenAI(
-                api_version="2023-12-01-preview",
-                azure_endpoint=AZURE_OPENAI_ENDPOINT,
-                api_key=AZURE_OPENAI_API_KEY,
-            )
+        _, _, HttpResponseError, ClientAuthenticationError, _ = _load_sdk()
 
-            self.search_client = SearchClient(
-                endpoint=AZURE_SEARCH_ENDPOINT,
-                index_name=index_name,
-                credential=self.search_credential,
-            )  # type: ignore
+        try:
+            # Analyzers are cheap per-request objects; the clients are shared per process
+            self.search_client, self.openai_client = _get_clients(index_name)
 
             self.model = model
+            self.index_name = index_name
+            self.speculative = speculative
+            self.session_id = session_id
+            self.last_context_plan: Optional[Dict[str, Any]] = None
 
         except ClientAuthenticationError as auth_error:
             raise RuntimeError("Authentication error - check API keys and endpoints") from auth_error
@@ -105,7 +339,8 @@ class RFPAnalyzer:
 
         return "\n".join(parts)
 
-    def search_and_generate(self, query: str, top: int = 5, select: str = None) -> Tuple[List[Any], str]:
+    def search_and_generate(self, query: str, top: int = 5, select: str = None,
+                            adaptive: bool = False) -> Tuple[List[Any], str]:
         """Search the Azure Search index and produce a grounded LLM response.
 
         Returns
@@ -117,35 +352,191 @@ class RFPAnalyzer:
         """
 
         # For backward compatibility, perform search then generate LLM response
-        documents = self.search(query, top=top, select=select)
-        response_text = self.generate_from_documents(documents, prompt=query)
+        documents = self.search(query, top=top, select=select, adaptive=adaptive)
+        excerpt_chars = self.last_context_plan and self.last_context_plan["excerpt_chars"]
+        sources = documents
+        if excerpt_chars:
+            sources = [{**doc, "chunk": (doc.get("chunk") or "")[:excerpt_chars]} for doc in documents]
+        response_text = self.generate_from_documents(sources, prompt=query)
         return documents, response_text
 
-    def search(self, query: str, top: int = 5, select: str = None) -> List[Any]:
-        """Execute only the Azure Search query and return documents (no LLM call)."""
-        select = select or "projectName,functionalRequirements,nonFunctionalRequirements,technicalRequirements,importance,skillsets,chunk"
+    def search(self, query: str, top: int = 5, select: str = None, rerank: bool = False,
+               candidates: int = RERANK_CANDIDATES, adaptive: bool = False,
+               latency_target: float = LATENCY_TARGET_SECONDS) -> List[Any]:
+        """Execute only the Azure Search query and return documents (no LLM call).
 
-        try:
+        With ``rerank=True`` a wider set of ``candidates`` is retrieved with
+        light fields and highlight snippets, scored locally (see rerank.py),
+        and only the best ``top`` are loaded with ``select`` and returned.
+
+        With ``adaptive=True`` ``top`` is no longer fixed: up to
+        ``max(top, ADAPTIVE_MAX_DOCS)`` results are considered and the count
+        and excerpt length are chosen from the score distribution and the
+        latency target (see context_sizing.py). The decision is recorded in
+        ``last_context_plan``; callers should cut chunks to its ``excerpt_chars``.
+        """
+        select = select or DEFAULT_SELECT
+        max_docs = max(top, ADAPTIVE_MAX_DOCS) if adaptive else top
+        if rerank:
+            documents = self._search_candidates(query, max(max_docs, candidates))
+        else:
+            documents = self._search_documents(query, max_docs, select)
+
+        self.last_context_plan = None
+        documents_head = documents[:max_docs]
+        if adaptive:
+            # The score distribution decides how many documents; reranking (if on) decides which
+            top = relevant_count(documents_head, max_docs=max_docs)
+
+        if rerank:
+            documents = self._load_documents(rerank_documents(query, documents, top), select)
+        else:
+            documents = documents[:top]
+
+        if adaptive:
+            # Size excerpts from the documents actually kept
+            self.last_context_plan = plan_context(documents_head, max_docs=max_docs, latency_target=latency_target,
+                                                  selected_documents=documents)
+            documents = documents[:self.last_context_plan["selected"]]
+
+        if self.speculative:
+            excerpt_chars = self.last_context_plan and self.last_context_plan["excerpt_chars"]
+            _speculation.start(self.session_id, extract_chunks(documents, excerpt_chars),
+                               DEFAULT_ANALYSIS_PROMPT, self._complete)
+
+        return documents
+
+    def _search_documents(self, query: str, top: int, select: str) -> List[Dict[str, Any]]:
+        key = fingerprint("search", self.index_name, _normalize(query, casefold=True), top,
+                          sorted(field.strip() for field in select.split(",")))
+
+        def request():
             search_results = self.search_client.search(
                 search_text=query,
+                timeout=SEARCH_TIMEOUT_SECONDS,
                 top=top,
                 select=select,  # type: ignore
             )
-            documents = list(search_results)
+            return list(search_results)
+
+        try:
+            # Coalesced callers share the result list, so each gets its own copies
+            return [dict(doc) for doc in _singleflight.do(key, request, timeout=SEARCH_WAIT_SECONDS)]
         except Exception as e:
             raise RuntimeError("Error during search") from e
 
+    def _search_candidates(self, query: str, top: int) -> List[Dict[str, Any]]:
+        """Rerank candidates: light fields, with highlight snippets standing in for long fields."""
+        key = fingerprint("candidates", self.index_name, _normalize(query, casefold=True), top)
+
+        def request():
+            return list(self.search_client.search(
+                search_text=query,
+                timeout=SEARCH_TIMEOUT_SECONDS,
+                top=top,
+                select=CANDIDATE_SELECT,  # type: ignore
+                highlight_fields=CANDIDATE_HIGHLIGHT_FIELDS,
+            ))
+
+        try:
+            results = _singleflight.do(key, request, timeout=SEARCH_WAIT_SECONDS)
+        except Exception as e:
+            raise RuntimeError("Error during search") from e
+
+        documents = []
+        for result in results:
+            doc = dict(result)
+            for field, fragments in (doc.pop("@search.highlights", None) or {}).items():
+                doc[field] = _HIGHLIGHT_TAG_RE.sub("", " … ".join(fragments))
+            documents.append(doc)
+        return documents
+
+    def _load_documents(self, chosen: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        """Fetch ``select`` fields for the chosen candidates in one request, keeping their order and scores."""
+        if not chosen:
+            return []
+        ids = [doc["id"] for doc in chosen]
+        fields = ",".join(dict.fromkeys(["id"] + [field.strip() for field in select.split(",")]))
+        key = fingerprint("load", self.index_name, ids, fields)
+        id_list = "|".join(doc_id.replace("'", "''") for doc_id in ids)
+
+        def request():
+            return list(self.search_client.search(
+                search_text="*",
+                timeout=SEARCH_TIMEOUT_SECONDS,
+                filter=f"search.in(id, '{id_list}', '|')",
+                top=len(ids),
+                select=fields,  # type: ignore
+            ))
+
+        try:
+            full = {doc["id"]: doc for doc in _singleflight.do(key, request, timeout=SEARCH_WAIT_SECONDS)}
+        except Exception as e:
+            raise RuntimeError("Error during search") from e
+
+        documents = []
+        for doc in chosen:
+            if doc["id"] in full:
+                loaded = dict(full[doc["id"]])
+                # Keep the query's relevance scores, not those of the id lookup
+                loaded["@search.score"] = doc.get("@search.score")
+                loaded["@rerank.score"] = doc.get("@rerank.score")
+                documents.append(loaded)
         return documents
 
+    def search_requirements(self, query: str, top: int = 10, priority_min: Optional[float] = None,
+                            req_types: Optional[List[str]] = None,
+                            candidates: int = REQUIREMENT_DOC_CANDIDATES) -> List[Dict[str, Any]]:
+        """Search individual requirements instead of whole chunks.
+
+        Priority and type are filtered server-side on the ``requirements``
+        collection, then matching requirements of the returned documents are
+        ranked and returned as compact records (id, type, priority, trimmed
+        text, page and related ids). The records can be passed directly to
+        ``generate_from_documents`` for small requirement-level prompts.
+        """
+        search_filter = requirement_filter(priority_min, req_types)
+        key = fingerprint("requirements", self.index_name, _normalize(query, casefold=True), candidates, search_filter)
+
+        def request():
+            return list(self.search_client.search(
+                search_text=query,
+                timeout=SEARCH_TIMEOUT_SECONDS,
+                filter=search_filter,
+                top=candidates,
+                select=REQUIREMENT_SELECT,  # type: ignore
+            ))
+
+        try:
+            documents = _singleflight.do(key, request, timeout=SEARCH_WAIT_SECONDS)
+        except Exception as e:
+            raise RuntimeError("Error during requirement search") from e
+
+        return rank_requirements(query, documents, top, priority_min=priority_min, req_types=req_types)
+
     def generate_from_documents(self, documents: List[Any], prompt: str) -> str:
         """Given a list of documents (dict-like) and a prompt, produce the LLM response.
 
         This separates the expensive LLM call from the search step so the UI can
         present documents first and call the model only when requested.
+        A matching speculative result for this session is reused when available.
         """
+        if self.speculative:
+            pending = _speculation.claim(self.session_id, documents, prompt)
+            if pending is not None:
+                return pending.result()
+
+        return self._complete(documents, prompt)
+
+    def discard_speculation(self) -> None:
+        """Drop this session's speculative analysis (prompt or selection changed)."""
+        _speculation.discard(self.session_id)
+
+    def _complete(self, documents: List[Any], prompt: str) -> str:
         # sources_formatted = self._format_sources(documents)
+        key = fingerprint("generate", self.model, _normalize(prompt), documents)
 
-        try:
+        def request():
             response = self.openai_client.chat.completions.create(
                 model=self.model,
                 messages=[
@@ -155,9 +546,12 @@ class RFPAnalyzer:
                     }
                 ],
                 temperature=0.8,
+                timeout=LLM_TIMEOUT_SECONDS,
             )
+            return response.choices[0].message.content
 
-            response_text = response.choices[0].message.content
+        try:
+            response_text = _singleflight.do(key, request, timeout=LLM_WAIT_SECONDS)
         except Exception as e:
             raise RuntimeError("Error generating LLM response") from e
 
@@ -174,8 +568,10 @@ if __name__ == "__main__":
     if "--cli" in sys.argv:
         try:
             analyzer = RFPAnalyzer()
-            docs, resp = analyzer.search_and_generate(default_query, top=5)
+            docs, resp = analyzer.search_and_generate(default_query, top=5, adaptive="--adaptive" in sys.argv)
             print(f"Found {len(docs)} documents matching the query.")
+            if analyzer.last_context_plan:
+                print(f"Adaptive context: {analyzer.last_context_plan}")
             print("\n--- SOURCES ---\n")
             print(analyzer._format_sources(docs))
             print("\n--- MODEL RESPONSE ---\n")
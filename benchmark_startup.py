@@ -0,0 +1,121 @@
+"""Cold-start benchmark for the app modules with a regression budget.
+
+Each target is imported in a fresh interpreter several times; the median
+import time is compared against its budget, and the heavy dependencies that
+must stay lazy are checked against ``sys.modules`` right after the import.
+Importing ``streamlit_app`` runs the whole script once in Streamlit's bare
+mode, which approximates the first render of a new session. Probes use a
+throwaway job, spill and archive directory and do not serve the job queue,
+so a benchmark never picks up real queued jobs or writes into the tree.
+
+Exits with status 1 when any target is over budget or loads a lazy module, so
+it can gate deployments:
+
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 7 --budget streamlit_app=2500
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+# Median import time budget per module, in milliseconds
+BUDGETS_MS = {
+    "app": 150,
+    "preorb": 50,
+    "jobs": 50,
+    "bulk_export": 50,
+    "streamlit_app": 3000,
+}
+
+# Modules that must only be loaded by the features that need them
+LAZY_MODULES = [
+    "fitz",
+    "docx",
+    "openpyxl",
+    "pandas",
+    "pyarrow",
+    "azure.storage.blob",
+    "azure.search.documents",
+    "openai",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+lazy = {lazy!r}
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in lazy if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, runs: int) -> Dict[str, object]:
+    """Import ``module`` in ``runs`` fresh interpreters and collect timings."""
+    scratch = tempfile.mkdtemp(prefix="rfp-benchmark-")
+    env = dict(
+        os.environ,
+        RFP_DISABLE_WARMUP="true",
+        RFP_JOB_SERVE="false",
+        RFP_JOB_DIR=os.path.join(scratch, "jobs"),
+        RFP_STORE_SPILL_DIR=os.path.join(scratch, "doc_store"),
+        RFP_SEARCH_ARCHIVE_DIR=os.path.join(scratch, "search_archive"),
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings: List[float] = []
+    loaded: List[str] = []
+    try:
+        for _ in range(runs):
+            proc = subprocess.run(
+                [sys.executable, "-c", _PROBE.format(module=module, lazy=LAZY_MODULES)],
+                cwd=here, env=env, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+            # Streamlit bare mode may print warnings before the probe output
+            sample = json.loads(proc.stdout.strip().splitlines()[-1])
+            timings.append(sample["ms"])
+            loaded = sample["loaded"]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {"median_ms": statistics.median(timings), "max_ms": max(timings), "loaded": loaded}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure module cold-start time against a budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="override a budget, e.g. streamlit_app=2500")
+    parser.add_argument("--only", action="append", default=[], metavar="MODULE",
+                        help="benchmark only these modules")
+    args = parser.parse_args(argv)
+
+    budgets = dict(BUDGETS_MS)
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        budgets[name] = float(value)
+    targets = args.only or list(budgets)
+
+    failed = False
+    for module in targets:
+        result = measure(module, args.runs)
+        budget = budgets[module]
+        over = result["median_ms"] > budget
+        status = "FAIL" if over or result["loaded"] else "ok"
+        failed = failed or status == "FAIL"
+        print(f'{status:<4} {module:<14} median {result["median_ms"]:7.1f} ms  '
+              f'max {result["max_ms"]:7.1f} ms  budget {budget:7.1f} ms')
+        if result["loaded"]:
+            print(f'     eagerly loaded: {", ".join(result["loaded"])}')
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
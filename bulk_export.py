@@ -0,0 +1,298 @@
+"""Streaming bulk export of search hits and extracted Pre-ORB fields.
+
+Hit rows are produced lazily from saved search results (``rfp_search_*.json``,
+written by ``archive_search`` for every UI search and capped at
+``RFP_SEARCH_ARCHIVE_MAX_FILES``) or fresh ``RFPAnalyzer.search`` calls, extraction rows from finished analysis
+jobs or fresh analyses, and written in constant memory:
+
+- XLSX with an openpyxl write-only workbook
+- CSV with pandas, ``CHUNK_ROWS`` rows at a time
+- Parquet with a pyarrow ``ParquetWriter``, one row group per chunk
+
+    python bulk_export.py hits -o hits.xlsx
+    python bulk_export.py hits --queries queries.txt --top 20 -o hits.parquet
+    python bulk_export.py extractions -o extractions.csv
+    python bulk_export.py hits --user <session_id> -o hits.csv
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from preorb import PREORB_FIELDS, parse_llm_response
+
+CHUNK_ROWS = 5000
+# Excel rejects longer cell values
+XLSX_MAX_CELL_CHARS = 32767
+SEARCH_ARCHIVE_DIR = os.getenv("RFP_SEARCH_ARCHIVE_DIR", "search_archive")
+# Oldest archived searches beyond this count are deleted
+SEARCH_ARCHIVE_MAX_FILES = int(os.getenv("RFP_SEARCH_ARCHIVE_MAX_FILES", "500"))
+SAVED_SEARCH_PATTERNS = ["rfp_search_*.json", os.path.join(SEARCH_ARCHIVE_DIR, "rfp_search_*.json")]
+FORMATS = ("xlsx", "csv", "parquet")
+
+HIT_COLUMNS = [
+    "source", "query", "timestamp", "rank", "score", "projectName", "importance",
+    "functionalRequirements", "nonFunctionalRequirements", "technicalRequirements", "skillsets", "chunk",
+]
+EXTRACTION_COLUMNS = ["source", "query", "timestamp"] + PREORB_FIELDS
+NUMERIC_COLUMNS = {"rank": "int64", "score": "float64", "importance": "float64"}
+
+# Display keys used by the UI when saving search results
+_SAVED_KEYS = {
+    "프로젝트명": "projectName",
+    "중요도": "importance",
+    "점수": "@search.score",
+    "기능요구사항": "functionalRequirements",
+    "비기능요구사항": "nonFunctionalRequirements",
+    "기술요구사항": "technicalRequirements",
+    "스킬셋": "skillsets",
+    "본문": "chunk",
+}
+
+
+def _flatten(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return value
+
+
+def hit_rows(source: str, query: str, documents: Iterable[Dict[str, Any]],
+             timestamp: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Rows for one search result list (search-field keys).
+
+    ``rank`` is the position in the search response; archived documents carry
+    it as ``@search.rank``.
+    """
+    for position, doc in enumerate(documents, start=1):
+        row = {"source": source, "query": query, "timestamp": timestamp,
+               "rank": doc.get("@search.rank") or position, "score": doc.get("@search.score")}
+        for column in HIT_COLUMNS[5:]:
+            row[column] = _flatten(doc.get(column))
+        yield row
+
+
+def archive_search(query: str, documents: List[Dict[str, Any]], user: str,
+                   directory: str = SEARCH_ARCHIVE_DIR, max_files: int = SEARCH_ARCHIVE_MAX_FILES) -> str:
+    """Save the hits of one search, in response order, and drop the oldest archives beyond ``max_files``."""
+    os.makedirs(directory, exist_ok=True)
+    now = datetime.now()
+    rows = [{"@search.rank": rank, "@search.score": doc.get("@search.score"),
+             **{column: doc.get(column) for column in HIT_COLUMNS[5:]}}
+            for rank, doc in enumerate(documents, start=1)]
+    # Time first so names sort chronologically; the suffix keeps concurrent sessions apart
+    path = os.path.join(directory, f"rfp_search_{now.strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"query": query, "timestamp": now.isoformat(), "user": user, "documents": rows},
+                  f, ensure_ascii=False, default=str)
+    # File names sort by time
+    archived = sorted(glob.glob(os.path.join(directory, "rfp_search_*.json")))
+    for old in archived[:max(0, len(archived) - max_files)]:
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            pass
+    return path
+
+
+def saved_search_files(patterns: Optional[List[str]] = None) -> List[str]:
+    paths = []
+    for pattern in patterns or SAVED_SEARCH_PATTERNS:
+        paths.extend(sorted(glob.glob(pattern)))
+    return list(dict.fromkeys(paths))
+
+
+def _load_saved(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def saved_hit_rows(paths: Iterable[str], user: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Hits from search results saved by the UI, one file in memory at a time.
+
+    With ``user`` only that session's searches are included.
+    """
+    for path in paths:
+        data = _load_saved(path)
+        if user is not None and data.get("user") != user:
+            continue
+        documents = ({_SAVED_KEYS.get(k, k): v for k, v in doc.items()} for doc in data.get("documents", []))
+        yield from hit_rows(os.path.basename(path), data.get("query", ""), documents, data.get("timestamp"))
+
+
+def job_extraction_rows(user: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Pre-ORB fields from finished analysis and Pre-ORB jobs."""
+    from jobs import SUCCEEDED, get_queue
+
+    for record in get_queue().list(user):
+        parsed = (record.get("result") or {}).get("parsed") if record["status"] == SUCCEEDED else None
+        if parsed:
+            params = record.get("params") or {}
+            yield {"source": f"job:{record['id']}", "query": params.get("query") or params.get("prompt", ""),
+                   "timestamp": datetime.fromtimestamp(record["created_at"]).isoformat(), **parsed}
+
+
+def live_hit_rows(analyzer, queries: Iterable[str], top: int, **search_kwargs) -> Iterator[Dict[str, Any]]:
+    """Run ``analyzer.search`` for each query and yield its hits."""
+    for query in queries:
+        documents = analyzer.search(query, top=top, **search_kwargs)
+        yield from hit_rows("search", query, documents, datetime.now().isoformat())
+
+
+def live_extraction_rows(analyzer, queries: Iterable[str], top: int, prompt: str) -> Iterator[Dict[str, Any]]:
+    """Search, analyze and parse each query (one model call per query)."""
+    from app import extract_chunks
+
+    for query in queries:
+        documents = analyzer.search(query, top=top)
+        response_text = analyzer.generate_from_documents(extract_chunks(documents), prompt=prompt)
+        yield {"source": "analysis", "query": query, "timestamp": datetime.now().isoformat(),
+               **parse_llm_response(response_text)}
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_xlsx(rows: Iterable[Dict[str, Any]], columns: List[str], out, sheet_title: str = "export") -> int:
+    import openpyxl
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    ws.append(columns)
+    count = 0
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row.get(column)
+            if isinstance(value, str):
+                value = ILLEGAL_CHARACTERS_RE.sub("", value)[:XLSX_MAX_CELL_CHARS]
+            values.append(value)
+        ws.append(values)
+        count += 1
+    wb.save(out)
+    return count
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], columns: List[str], out, chunk_rows: int = CHUNK_ROWS) -> int:
+    import pandas as pd
+
+    count = 0
+    # utf-8-sig so Excel opens Korean text correctly
+    with open(out, "w", encoding="utf-8-sig", newline="") if isinstance(out, str) else _nullcontext(out) as f:
+        for chunk in _chunks(rows, chunk_rows):
+            pd.DataFrame(chunk, columns=columns).to_csv(f, header=count == 0, index=False)
+            count += len(chunk)
+        if count == 0:
+            pd.DataFrame(columns=columns).to_csv(f, index=False)
+    return count
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], columns: List[str], out, chunk_rows: int = CHUNK_ROWS) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from e
+
+    types = {"int64": pa.int64(), "float64": pa.float64()}
+    schema = pa.schema([(c, types[NUMERIC_COLUMNS[c]] if c in NUMERIC_COLUMNS else pa.string()) for c in columns])
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in _chunks(rows, chunk_rows):
+            table = pa.Table.from_pylist([_typed(row, columns) for row in chunk], schema=schema)
+            writer.write_table(table)
+            count += len(chunk)
+    return count
+
+
+def _typed(row: Dict[str, Any], columns: List[str]) -> Dict[str, Any]:
+    typed = {}
+    for column in columns:
+        value = row.get(column)
+        if value is None or value == "":
+            typed[column] = None
+        elif column in NUMERIC_COLUMNS:
+            try:
+                typed[column] = int(value) if NUMERIC_COLUMNS[column] == "int64" else float(value)
+            except (TypeError, ValueError):
+                typed[column] = None
+        else:
+            typed[column] = str(value)
+    return typed
+
+
+class _nullcontext:
+    def __init__(self, value):
+        self.value = value
+
+    def __enter__(self):
+        return self.value
+
+    def __exit__(self, *exc):
+        return False
+
+
+def export(rows: Iterable[Dict[str, Any]], columns: List[str], fmt: str, out) -> int:
+    """Write ``rows`` to ``out`` (path or binary/text stream) in ``fmt``; returns the row count."""
+    if fmt == "xlsx":
+        return write_xlsx(rows, columns, out)
+    if fmt == "csv":
+        return write_csv(rows, columns, out)
+    if fmt == "parquet":
+        return write_parquet(rows, columns, out)
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk export of RFP search hits and extracted fields")
+    parser.add_argument("kind", choices=["hits", "extractions"])
+    parser.add_argument("-o", "--output", required=True, help="output file (.xlsx, .csv or .parquet)")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the output file extension")
+    parser.add_argument("--queries", help="text file with one query per line; runs fresh searches")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--saved", action="append", help="glob of saved search JSON files (hits, repeatable)")
+    parser.add_argument("--jobs", action="store_true", help="include finished analysis jobs (extractions)")
+    parser.add_argument("--user", help="only searches and jobs of this UI session")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        parser.error(f"cannot infer format from {args.output!r}; use --format")
+
+    sources = []
+    if args.queries:
+        from app import DEFAULT_ANALYSIS_PROMPT, RFPAnalyzer
+
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        analyzer = RFPAnalyzer()
+        if args.kind == "hits":
+            sources.append(live_hit_rows(analyzer, queries, args.top))
+        else:
+            sources.append(live_extraction_rows(analyzer, queries, args.top, DEFAULT_ANALYSIS_PROMPT))
+    if args.kind == "hits" and (args.saved or not args.queries):
+        sources.append(saved_hit_rows(saved_search_files(args.saved), args.user))
+    if args.kind == "extractions" and (args.jobs or not args.queries):
+        sources.append(job_extraction_rows(args.user))
+
+    columns = HIT_COLUMNS if args.kind == "hits" else EXTRACTION_COLUMNS
+    rows = (row for source in sources for row in source)
+    count = export(rows, columns, fmt, args.output)
+    print(f"Exported {count} rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
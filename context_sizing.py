@@ -0,0 +1,109 @@
+"""Score-aware adaptive choice of how much search context to send to the model.
+
+Instead of a fixed ``top``, the adaptive mode fetches up to ``max_docs``
+results and looks at their ``@search.score`` distribution: it stops at the
+first sharp relevance drop-off or once scores fall well below the best hit.
+The kept documents and their per-document excerpt length are then scaled so
+that the estimated generation latency fits ``latency_target`` seconds.
+
+Narrow queries (one or two clearly relevant hits) end up sending two documents
+instead of eight, while broad queries with flat score curves keep more.
+The returned plan records every decision so the UI and logs can show it.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+ADAPTIVE_MAX_DOCS = int(os.getenv("RFP_ADAPTIVE_MAX_DOCS", "12"))
+LATENCY_TARGET_SECONDS = float(os.getenv("RFP_LATENCY_TARGET_SECONDS", "20"))
+
+# Keep documents scoring at least this fraction of the best hit
+RELATIVE_CUTOFF = 0.5
+# Stop at a gap between neighbours larger than this fraction of the best score
+DROP_OFF = 0.25
+MIN_DOCS = 1
+
+# Rough latency model of a grounded generation: fixed overhead (queueing,
+# output tokens) plus prompt processing proportional to the source size.
+BASE_LATENCY_SECONDS = 6.0
+SECONDS_PER_1K_CHARS = 0.25
+MIN_EXCERPT_CHARS = 500
+
+
+def estimate_latency(total_chars: int) -> float:
+    return BASE_LATENCY_SECONDS + total_chars / 1000 * SECONDS_PER_1K_CHARS
+
+
+def _score(doc: Dict[str, Any]) -> float:
+    try:
+        return float(doc.get("@search.score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def relevance_cutoff(scores: List[float]) -> Dict[str, Any]:
+    """Return how many leading scores to keep and why."""
+    if not scores or scores[0] <= 0:
+        return {"count": len(scores), "reason": "no-scores", "cutoff_score": None}
+    best = scores[0]
+    for i in range(1, len(scores)):
+        if scores[i] < RELATIVE_CUTOFF * best:
+            return {"count": i, "reason": "below-relative-cutoff", "cutoff_score": scores[i - 1]}
+        if (scores[i - 1] - scores[i]) / best > DROP_OFF:
+            return {"count": i, "reason": "score-drop-off", "cutoff_score": scores[i - 1]}
+    return {"count": len(scores), "reason": "flat-scores", "cutoff_score": scores[-1]}
+
+
+def relevant_count(documents: List[Dict[str, Any]], max_docs: int = ADAPTIVE_MAX_DOCS,
+                   min_docs: int = MIN_DOCS) -> int:
+    """How many documents the score distribution keeps, before any latency trim."""
+    scores = sorted((_score(doc) for doc in documents), reverse=True)
+    return min(len(scores), max(min_docs, relevance_cutoff(scores[:max_docs])["count"]))
+
+
+def plan_context(documents: List[Dict[str, Any]], *, max_docs: int = ADAPTIVE_MAX_DOCS,
+                 latency_target: float = LATENCY_TARGET_SECONDS, min_docs: int = MIN_DOCS,
+                 selected_documents: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Decide how many of ``documents`` (in search-score order) to send and how long each excerpt is.
+
+    ``selected_documents`` are the documents actually sent, in their final
+    order (e.g. the reranker's pick of the planned count); excerpt length is
+    sized from them instead of the top-scoring ``documents``. The latency trim
+    may drop trailing ones, so callers keep only the first ``selected``.
+    ``excerpt_chars`` is ``None`` when whole chunks fit the latency target.
+    """
+    scores = sorted((_score(doc) for doc in documents), reverse=True)
+    cutoff = relevance_cutoff(scores[:max_docs])
+    count = min(len(scores), max(min_docs, cutoff["count"]))
+    reason = cutoff["reason"]
+
+    if selected_documents is None:
+        selected_documents = sorted(documents, key=_score, reverse=True)[:count]
+    count = min(count, len(selected_documents))
+    lengths = [len(doc.get("chunk") or "") for doc in selected_documents]
+
+    char_budget = max(0.0, latency_target - BASE_LATENCY_SECONDS) / SECONDS_PER_1K_CHARS * 1000
+    excerpt_chars: Optional[int] = None
+    if sum(lengths[:count]) > char_budget:
+        # Shorten excerpts first; drop the weakest documents if excerpts get too short
+        dropped = False
+        while count > min_docs and char_budget / count < MIN_EXCERPT_CHARS:
+            count -= 1
+            dropped = True
+        if dropped:
+            reason += "+latency-drop"
+        excerpt_chars = max(MIN_EXCERPT_CHARS, int(char_budget / max(count, 1)))
+        reason += "+latency-trim"
+
+    sent_chars = sum(min(length, excerpt_chars or length) for length in lengths[:count])
+    return {
+        "candidates": len(documents),
+        "selected": count,
+        "reason": reason,
+        "cutoff_score": cutoff["cutoff_score"],
+        "top_score": scores[0] if scores else None,
+        "excerpt_chars": excerpt_chars,
+        "context_chars": sent_chars,
+        "estimated_seconds": round(estimate_latency(sent_chars), 1),
+        "latency_target": latency_target,
+    }
@@ -1,5 +1,29 @@
+"""Azure Search index schema and index management CLI.
+
+    python create_search_index.py                      # drop and recreate rfp-syryu-obj (legacy)
+    python create_search_index.py --profile lean       # same, with the lean schema profile
+    python create_search_index.py rebuild --profile lean --sample-query "은행 BPR"
+    python create_search_index.py rebuild --local      # dry run against an in-memory index service
+
+``rebuild`` performs a zero-downtime blue/green rebuild (see index_rebuild.py):
+a versioned index is built next to the live one, bulk-loaded and validated,
+then the alias the app queries (AZURE_SEARCH_ALIAS) is switched to it. The
+indexer feeding the index (AZURE_SEARCH_INDEXER) is moved to the new index and
+run, so newly ingested RFPs keep reaching the alias. Point AZURE_SEARCH_INDEX
+at the alias so the app follows the switch; until it does, the first rebuild
+refuses to move the indexer off the legacy index unless --clients-use-alias
+confirms that every other client queries the alias.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional
+
 from azure.core.credentials import AzureKeyCredential
-from azure.search.documents.indexes import SearchIndexClient
+from azure.search.documents.indexes import SearchIndexClient, SearchIndexerClient
 from azure.search.documents.indexes.models import (
     SearchIndex,
     SimpleField,
@@ -8,7 +32,6 @@ from azure.search.documents.indexes.models import (
     ComplexField,
     CorsOptions
 )
-import os
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,81 +39,219 @@ load_dotenv()
 AZURE_SEARCH_API_KEY = os.getenv("AZURE_SEARCH_API_KEY")
 AZURE_SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
 INDEX_NAME = "rfp-syryu-obj"
+ALIAS_NAME = os.getenv("AZURE_SEARCH_ALIAS", "rfp-syryu")
+INDEXER_NAME = os.getenv("AZURE_SEARCH_INDEXER", "rfp-syryu-obj-indexer")
 
-# Initialize the search index client
-search_client = SearchIndexClient(
-    endpoint=AZURE_SEARCH_ENDPOINT,
-    credential=AzureKeyCredential(AZURE_SEARCH_API_KEY)
-)
+# Schema profiles: per-field overrides of the "full" schema. Keys are field
+# paths ("requirements/category" for sub-fields). The lean profile turns off
+# searchable/filterable on fields the app never matches or filters on: queries
+# are free text over project, requirement, skill and chunk content, select
+# only the fields in app.py, and filter only on requirement id/type/priority/page.
+SCHEMA_PROFILES: Dict[str, Dict[str, Dict[str, bool]]] = {
+    "full": {},
+    "lean": {
+        "fileName": {"searchable": False, "filterable": False},
+        "projectName": {"filterable": False},
+        "clientName": {"searchable": False, "filterable": False},
+        "requirements/reqId": {"searchable": False},
+        "requirements/reqType": {"searchable": False},
+        "requirements/category": {"searchable": False, "filterable": False},
+        "requirements/acceptanceCriteria": {"searchable": False},
+        "requirements/estimatedEffort": {"filterable": False},
+        "requirements/stakeholders": {"searchable": False, "filterable": False},
+        "requirements/dependencies": {"searchable": False, "filterable": False},
+        "requirements/relatedReqIds": {"searchable": False, "filterable": False},
+        "requirementCategories": {"searchable": False, "filterable": False},
+        "keyKeywords": {"filterable": False},
+        "skillsets": {"filterable": False},
+        "analysisNotes": {"searchable": False},
+        "constraints": {"searchable": False},
+        "regulatoryRequirements": {"searchable": False, "filterable": False},
+        "technicalStack": {"searchable": False, "filterable": False},
+        "tags": {"searchable": False, "filterable": False},
+        "riskFactors": {"searchable": False},
+    },
+}
+
+
+def _field(profile: str, name: str, type, *, path: Optional[str] = None, searchable: bool = False,
+           filterable: bool = False, sortable: bool = False, key: bool = False, analyzer_name: Optional[str] = None):
+    override = SCHEMA_PROFILES[profile].get(path or name, {})
+    searchable = override.get("searchable", searchable)
+    filterable = override.get("filterable", filterable)
+    if searchable:
+        return SearchableField(name=name, type=type, key=key, filterable=filterable, sortable=sortable,
+                               analyzer_name=analyzer_name)
+    return SimpleField(name=name, type=type, key=key, filterable=filterable, sortable=sortable)
 
-# Define the index
-index = SearchIndex(
-    name=INDEX_NAME,
-    fields=[
-    # Base Fields
-    # Note: key field must be Edm.String and use the keyword analyzer for projections
-    SearchableField(name="id", type=SearchFieldDataType.String, key=True, analyzer_name="keyword", filterable=True),
-        SearchableField(name="fileName", type=SearchFieldDataType.String, filterable=True),
-        SimpleField(name="fileUrl", type=SearchFieldDataType.String),
-        SimpleField(name="uploadDate", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
+
+def build_fields(profile: str = "full") -> List:
+    """Return the index fields for ``profile``."""
+    f = partial(_field, profile)
+
+    def r(name, *args, **kwargs):
+        return _field(profile, name, *args, path=f"requirements/{name}", **kwargs)
+
+    String = SearchFieldDataType.String
+    Strings = SearchFieldDataType.Collection(SearchFieldDataType.String)
+
+    return [
+        # Base Fields
+        # Note: key field must be Edm.String and use the keyword analyzer for projections
+        f("id", String, key=True, searchable=True, analyzer_name="keyword", filterable=True),
+        f("fileName", String, searchable=True, filterable=True),
+        f("fileUrl", String),
+        f("uploadDate", SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
 
         # Project Information Fields
-        SearchableField(name="projectName", type=SearchFieldDataType.String, filterable=True),
-        SearchableField(name="projectSummary", type=SearchFieldDataType.String, analyzer_name="ko.microsoft"),
-        SearchableField(name="clientName", type=SearchFieldDataType.String, filterable=True),
-        SimpleField(name="budget", type=SearchFieldDataType.Double, filterable=True, sortable=True),
-        SimpleField(name="projectDuration", type=SearchFieldDataType.Int32, filterable=True),
-        SimpleField(name="projectStartDate", type=SearchFieldDataType.DateTimeOffset, filterable=True),
-        SimpleField(name="projectEndDate", type=SearchFieldDataType.DateTimeOffset, filterable=True),
+        f("projectName", String, searchable=True, filterable=True),
+        f("projectSummary", String, searchable=True, analyzer_name="ko.microsoft"),
+        f("clientName", String, searchable=True, filterable=True),
+        f("budget", SearchFieldDataType.Double, filterable=True, sortable=True),
+        f("projectDuration", SearchFieldDataType.Int32, filterable=True),
+        f("projectStartDate", SearchFieldDataType.DateTimeOffset, filterable=True),
+        f("projectEndDate", SearchFieldDataType.DateTimeOffset, filterable=True),
+
+        # Chunk text produced by the indexer (selected by app.py)
+        f("chunk", String, searchable=True, analyzer_name="ko.microsoft"),
 
         # Requirements as a collection of complex objects (one item per RFP requirement)
         ComplexField(name="requirements", fields=[
-            SearchableField(name="reqId", type=SearchFieldDataType.String, filterable=True),
-            SearchableField(name="reqType", type=SearchFieldDataType.String, filterable=True),
-            SearchableField(name="category", type=SearchFieldDataType.String, filterable=True),
-            SearchableField(name="text", type=SearchFieldDataType.String, analyzer_name="ko.microsoft"),
-            SearchableField(name="acceptanceCriteria", type=SearchFieldDataType.String, analyzer_name="ko.microsoft"),
-            SimpleField(name="priority", type=SearchFieldDataType.Double, filterable=True),
-            SimpleField(name="estimatedEffort", type=SearchFieldDataType.Double, filterable=True),
-            SimpleField(name="sourcePage", type=SearchFieldDataType.Int32, filterable=True),
-            SearchableField(name="stakeholders", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft", filterable=True),
-            SearchableField(name="dependencies", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft", filterable=True),
-            SearchableField(name="relatedReqIds", type=SearchFieldDataType.Collection(SearchFieldDataType.String), filterable=True)
+            r("reqId", String, searchable=True, filterable=True),
+            r("reqType", String, searchable=True, filterable=True),
+            r("category", String, searchable=True, filterable=True),
+            r("text", String, searchable=True, analyzer_name="ko.microsoft"),
+            r("acceptanceCriteria", String, searchable=True, analyzer_name="ko.microsoft"),
+            r("priority", SearchFieldDataType.Double, filterable=True),
+            r("estimatedEffort", SearchFieldDataType.Double, filterable=True),
+            r("sourcePage", SearchFieldDataType.Int32, filterable=True),
+            r("stakeholders", Strings, searchable=True, analyzer_name="ko.microsoft", filterable=True),
+            r("dependencies", Strings, searchable=True, analyzer_name="ko.microsoft", filterable=True),
+            r("relatedReqIds", Strings, searchable=True, filterable=True)
         ], collection=True),
 
         # Aggregated requirement fields (legacy/backwards compatible)
-        SearchableField(name="functionalRequirements", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft"),
-        SearchableField(name="nonFunctionalRequirements", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft"),
-        SearchableField(name="technicalRequirements", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft"),
-        SearchableField(name="requirementCategories", type=SearchFieldDataType.Collection(SearchFieldDataType.String), filterable=True),
+        f("functionalRequirements", Strings, searchable=True, analyzer_name="ko.microsoft"),
+        f("nonFunctionalRequirements", Strings, searchable=True, analyzer_name="ko.microsoft"),
+        f("technicalRequirements", Strings, searchable=True, analyzer_name="ko.microsoft"),
+        f("requirementCategories", Strings, searchable=True, filterable=True),
 
         # Analysis Fields
-        SearchableField(name="keyKeywords", type=SearchFieldDataType.Collection(SearchFieldDataType.String), filterable=True),
+        f("keyKeywords", Strings, searchable=True, filterable=True),
         # Skillsets (collection) for faceting/filtering by skill
-        SearchableField(name="skillsets", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft", filterable=True),
-        SimpleField(name="importance", type=SearchFieldDataType.Double, filterable=True, sortable=True),
-        SearchableField(name="analysisNotes", type=SearchFieldDataType.String, analyzer_name="ko.microsoft"),
-        SearchableField(name="constraints", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft"),
-        SearchableField(name="regulatoryRequirements", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft", filterable=True),
-        SearchableField(name="technicalStack", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft", filterable=True),
-        SearchableField(name="tags", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft", filterable=True),
-        SearchableField(name="riskFactors", type=SearchFieldDataType.Collection(SearchFieldDataType.String), analyzer_name="ko.microsoft")
-    ],
-    cors_options=CorsOptions(allowed_origins=["*"])
-)
+        f("skillsets", Strings, searchable=True, analyzer_name="ko.microsoft", filterable=True),
+        f("importance", SearchFieldDataType.Double, filterable=True, sortable=True),
+        f("analysisNotes", String, searchable=True, analyzer_name="ko.microsoft"),
+        f("constraints", Strings, searchable=True, analyzer_name="ko.microsoft"),
+        f("regulatoryRequirements", Strings, searchable=True, analyzer_name="ko.microsoft", filterable=True),
+        f("technicalStack", Strings, searchable=True, analyzer_name="ko.microsoft", filterable=True),
+        f("tags", Strings, searchable=True, analyzer_name="ko.microsoft", filterable=True),
+        f("riskFactors", Strings, searchable=True, analyzer_name="ko.microsoft")
+    ]
+
+
+def build_index(name: str = INDEX_NAME, profile: str = "full") -> SearchIndex:
+    """Define the index"""
+    return SearchIndex(
+        name=name,
+        fields=build_fields(profile),
+        cors_options=CorsOptions(allowed_origins=["*"])
+    )
+
+
+def versioned_index_name(base: str = INDEX_NAME) -> str:
+    return f"{base}-v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+
+def recreate_index(search_client: SearchIndexClient, profile: str = "full") -> None:
+    """Drop and recreate INDEX_NAME in place (search is unavailable meanwhile)."""
+    index = build_index(INDEX_NAME, profile)
+    try:
+        # Delete the index if it exists
+        if INDEX_NAME in [index.name for index in search_client.list_indexes()]:
+            search_client.delete_index(INDEX_NAME)
+            print(f"Deleted existing index '{INDEX_NAME}'")
+
+        # Create the new index
+        result = search_client.create_index(index)
+        print(f"Created index '{result.name}' successfully")
+        print("\nIndex fields:")
+        for field in result.fields:
+            print(f"- {field.name} ({field.type})")
+
+    except Exception as e:
+        print(f"Error creating index: {str(e)}")
+
+
+def _local_clients():
+    """In-memory index and indexer services seeded with the legacy index and the sample document."""
+    from index_rebuild import LocalIndexClient, LocalIndexerClient
+    from upload_sample_data import sample_doc
+
+    client = LocalIndexClient()
+    client.create_index(build_index(INDEX_NAME, "full"))
+    client.get_search_client(INDEX_NAME).upload_documents([sample_doc])
+    indexer_client = LocalIndexerClient(client)
+    indexer_client.add_indexer(INDEXER_NAME, INDEX_NAME, [sample_doc])
+    return client, indexer_client
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Create or rebuild the RFP search index")
+    parser.add_argument("command", nargs="?", choices=["create", "rebuild"], default="create")
+    parser.add_argument("--profile", choices=sorted(SCHEMA_PROFILES), default="full")
+    parser.add_argument("--alias", default=ALIAS_NAME, help="alias the app queries (rebuild)")
+    parser.add_argument("--sample-query", action="append", default=[], help="query compared on old and new index (rebuild)")
+    parser.add_argument("--keep-old", action="store_true", help="do not delete the previous index after the switch (rebuild)")
+    parser.add_argument("--local", action="store_true", help="run against an in-memory index service (rebuild)")
+    parser.add_argument("--indexer", default=INDEXER_NAME, help="indexer moved to the new index (rebuild)")
+    parser.add_argument("--no-indexer", action="store_true", help="leave the indexer alone (rebuild)")
+    parser.add_argument("--reindex", action="store_true", help="reset the indexer so it reprocesses every source document (rebuild)")
+    parser.add_argument("--clients-use-alias", action="store_true",
+                        help="confirm every client queries the alias, so the indexer may leave the legacy index (rebuild)")
+    args = parser.parse_args(argv)
+
+    if args.local:
+        search_client, indexer_client = _local_clients()
+    else:
+        # Initialize the search index client
+        credential = AzureKeyCredential(AZURE_SEARCH_API_KEY)
+        search_client = SearchIndexClient(endpoint=AZURE_SEARCH_ENDPOINT, credential=credential)
+        indexer_client = SearchIndexerClient(endpoint=AZURE_SEARCH_ENDPOINT, credential=credential)
+
+    if args.command == "create":
+        recreate_index(search_client, args.profile)
+        return 0
+
+    from index_rebuild import RebuildError, rebuild_index
+
+    try:
+        summary = rebuild_index(
+            search_client,
+            build_index(versioned_index_name(), args.profile),
+            alias=args.alias,
+            fallback_index=INDEX_NAME,
+            sample_queries=args.sample_query,
+            retire=not args.keep_old,
+            indexer_client=None if args.no_indexer else indexer_client,
+            indexer_name=args.indexer,
+            reindex=args.reindex,
+            # The app reads AZURE_SEARCH_INDEX from the same environment
+            clients_use_alias=args.clients_use_alias or os.getenv("AZURE_SEARCH_INDEX") == args.alias,
+        )
+    except RebuildError as e:
+        print(f"Rebuild aborted, live index unchanged: {e}")
+        return 1
+
+    print(f"Alias '{summary['alias']}' now points to '{summary['index']}' ({summary['documents']} documents)")
+    if summary["indexer"]:
+        print(f"Indexer '{args.indexer}' now writes to '{summary['index']}' (last run: {summary['indexer']['status']})")
+    if summary["retired"]:
+        print(f"Deleted previous index '{summary['retired']}'")
+    elif summary["previous"]:
+        print(f"Kept previous index '{summary['previous']}'")
+    return 0
+
 
-try:
-    # Delete the index if it exists
-    if INDEX_NAME in [index.name for index in search_client.list_indexes()]:
-        search_client.delete_index(INDEX_NAME)
-        print(f"Deleted existing index '{INDEX_NAME}'")
-    
-    # Create the new index
-    result = search_client.create_index(index)
-    print(f"Created index '{result.name}' successfully")
-    print("\nIndex fields:")
-    for field in result.fields:
-        print(f"- {field.name} ({field.type})")
-
-except Exception as e:
-    print(f"Error creating index: {str(e)}")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Process-wide, content-addressed document store shared by UI sessions.
+
+Streamlit sessions used to keep their own copies of search results, uploaded
+texts and LLM responses, so memory grew linearly with concurrent analysts.
+Sessions now keep ``DocRef`` handles instead; identical content is stored
+once under its SHA-256 hash and reference counted. When resident content
+exceeds ``RFP_STORE_MAX_BYTES`` the least recently used entries are spilled
+to ``RFP_STORE_SPILL_DIR`` and loaded back on access.
+
+Stored values are shared between sessions and must be treated as read-only.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+STORE_MAX_BYTES = int(os.getenv("RFP_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+STORE_SPILL_DIR = os.getenv("RFP_STORE_SPILL_DIR", ".doc_store")
+
+
+class DocRef:
+    """Handle to a stored document; its reference is released when the handle is collected."""
+
+    __slots__ = ("id", "_store", "__weakref__")
+
+    def __init__(self, store: "DocumentStore", doc_id: str):
+        self.id = doc_id
+        self._store = store
+        weakref.finalize(self, store.release, doc_id)
+
+    def get(self) -> Any:
+        return self._store.get(self.id)
+
+    def __repr__(self) -> str:
+        return f"DocRef({self.id[:12]})"
+
+
+class DocumentStore:
+    """Reference-counted store keyed by content hash, with LRU spill to disk."""
+
+    def __init__(self, max_bytes: int = STORE_MAX_BYTES, spill_dir: str = STORE_SPILL_DIR):
+        self.max_bytes = max_bytes
+        # Spill files belong to this process; leftovers from a previous run are discarded
+        self.spill_dir = os.path.join(spill_dir, str(os.getpid()))
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self._lock = threading.RLock()
+        self._resident: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._spilled: Dict[str, int] = {}
+        self._refs: Dict[str, int] = {}
+        self.resident_bytes = 0
+        self.counters = {"puts": 0, "dedup_hits": 0, "spills": 0, "loads": 0}
+
+    @staticmethod
+    def _encode(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+
+    def put(self, obj: Any) -> DocRef:
+        """Store ``obj`` (JSON-serializable) and return a handle to it."""
+        payload = self._encode(obj)
+        doc_id = hashlib.sha256(payload).hexdigest()
+        with self._lock:
+            self.counters["puts"] += 1
+            self._refs[doc_id] = self._refs.get(doc_id, 0) + 1
+            if doc_id in self._resident:
+                self._resident.move_to_end(doc_id)
+                self.counters["dedup_hits"] += 1
+            elif doc_id in self._spilled:
+                self.counters["dedup_hits"] += 1
+            else:
+                self._add_resident(doc_id, obj, len(payload))
+        return DocRef(self, doc_id)
+
+    def put_many(self, objs: Iterable[Any]) -> List[DocRef]:
+        return [self.put(obj) for obj in objs]
+
+    def get(self, doc_id: str) -> Any:
+        with self._lock:
+            if doc_id in self._resident:
+                self._resident.move_to_end(doc_id)
+                return self._resident[doc_id]
+            if doc_id not in self._spilled:
+                raise KeyError(doc_id)
+            with open(self._spill_path(doc_id), encoding="utf-8") as f:
+                obj = json.load(f)
+            size = self._spilled.pop(doc_id)
+            os.remove(self._spill_path(doc_id))
+            self.counters["loads"] += 1
+            self._add_resident(doc_id, obj, size)
+            return obj
+
+    def get_many(self, refs: Iterable[DocRef]) -> List[Any]:
+        return [ref.get() for ref in refs]
+
+    def release(self, doc_id: str) -> None:
+        with self._lock:
+            count = self._refs.get(doc_id, 0) - 1
+            if count > 0:
+                self._refs[doc_id] = count
+                return
+            self._refs.pop(doc_id, None)
+            if doc_id in self._resident:
+                del self._resident[doc_id]
+                self.resident_bytes -= self._sizes.pop(doc_id)
+            elif self._spilled.pop(doc_id, None) is not None:
+                self._sizes.pop(doc_id, None)
+                try:
+                    os.remove(self._spill_path(doc_id))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Resident/spilled sizes (UTF-8 JSON bytes) and counters."""
+        with self._lock:
+            return {
+                "entries": len(self._resident) + len(self._spilled),
+                "resident_entries": len(self._resident),
+                "resident_bytes": self.resident_bytes,
+                "spilled_entries": len(self._spilled),
+                "spilled_bytes": sum(self._spilled.values()),
+                "references": sum(self._refs.values()),
+                "max_bytes": self.max_bytes,
+                **self.counters,
+            }
+
+    def _add_resident(self, doc_id: str, obj: Any, size: int) -> None:
+        self._resident[doc_id] = obj
+        self._sizes[doc_id] = size
+        self.resident_bytes += size
+        self._spill_cold()
+
+    def _spill_cold(self) -> None:
+        # Keep at least the most recently used entry in memory
+        while self.resident_bytes > self.max_bytes and len(self._resident) > 1:
+            doc_id, obj = self._resident.popitem(last=False)
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self._spill_path(doc_id), "w", encoding="utf-8") as f:
+                json.dump(obj, f, ensure_ascii=False, default=str)
+            size = self._sizes[doc_id]
+            self._spilled[doc_id] = size
+            self.resident_bytes -= size
+            self.counters["spills"] += 1
+
+    def _spill_path(self, doc_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{doc_id}.json")
+
+
+_store: Optional[DocumentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> DocumentStore:
+    """Return the process-wide document store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DocumentStore()
+        return _store
@@ -0,0 +1,333 @@
+"""Zero-downtime blue/green rebuild of the RFP search index behind an alias.
+
+The app queries an alias rather than a concrete index. A rebuild creates a
+new versioned index next to the live one, bulk-loads it from the live index,
+moves the indexer that feeds the live index over to it and runs it, validates
+document counts and sample queries, switches the alias in a single call and
+finally retires the previous index. If anything fails before the switch, the
+indexer is pointed back, the new index is deleted and the live index is left
+untouched.
+
+Moving the indexer matters: otherwise it keeps writing to the old index and the
+alias serves a frozen copy that every later rebuild copies again. The first
+rebuild, while the legacy index is still queried by name, only moves it once
+the caller confirms that every client queries the alias
+(``clients_use_alias``); otherwise those clients would silently be left on
+a frozen index instead.
+
+``LocalIndexClient`` and ``LocalIndexerClient`` are in-memory stand-ins for
+``SearchIndexClient`` and ``SearchIndexerClient`` with the subset of the API
+used here, for dry runs and tests.
+"""
+
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+try:
+    from azure.search.documents.indexes.models import SearchAlias
+except ImportError:  # SDK versions without alias models
+    SearchAlias = namedtuple("SearchAlias", ["name", "indexes"])
+
+BATCH_SIZE = 500
+VALIDATE_TIMEOUT_SECONDS = 120
+INDEXER_TIMEOUT_SECONDS = 1800
+SAMPLE_TOP = 5
+
+
+class RebuildError(RuntimeError):
+    """Raised when a rebuild is aborted before the alias switch."""
+
+
+def _key_field(index) -> str:
+    return next(field.name for field in index.fields if getattr(field, "key", False))
+
+
+def resolve_live_index(index_client, alias: str, fallback_index: str) -> Dict[str, Any]:
+    """Return the index currently served by ``alias``, or the legacy index if no alias exists yet."""
+    try:
+        return {"name": index_client.get_alias(alias).indexes[0], "aliased": True}
+    except ResourceNotFoundError:
+        return {"name": fallback_index, "aliased": False}
+
+
+def copy_documents(source, target, field_names: Iterable[str], batch_size: int = BATCH_SIZE) -> int:
+    """Stream every document of ``source`` into ``target`` in batches.
+
+    Only fields defined in the new schema are copied. Search paging caps the
+    scan at 100k documents, well above the size of this corpus.
+    """
+    field_names = set(field_names)
+    batch: List[Dict[str, Any]] = []
+    total = 0
+    for doc in source.search(search_text="*"):
+        batch.append({k: v for k, v in doc.items() if k in field_names})
+        if len(batch) >= batch_size:
+            target.upload_documents(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        target.upload_documents(batch)
+        total += len(batch)
+    return total
+
+
+def validate(source, target, key: str, sample_queries: Iterable[str],
+             timeout: float = VALIDATE_TIMEOUT_SECONDS, poll: float = 2.0) -> Dict[str, Any]:
+    """Check that no documents are missing and that sample queries still return results.
+
+    The new index may hold more documents than the live one when the indexer
+    picked up new RFPs during the rebuild.
+    """
+    expected = source.get_document_count()
+    deadline = time.monotonic() + timeout
+    # Counts are eventually consistent right after a bulk load
+    actual = target.get_document_count()
+    while actual < expected and time.monotonic() < deadline:
+        time.sleep(poll)
+        actual = target.get_document_count()
+    if actual < expected:
+        raise RebuildError(f"document count mismatch: live={expected}, new={actual}")
+
+    overlaps = {}
+    for query in sample_queries:
+        live_ids = [doc[key] for doc in source.search(search_text=query, top=SAMPLE_TOP, select=key)]
+        new_ids = [doc[key] for doc in target.search(search_text=query, top=SAMPLE_TOP, select=key)]
+        if live_ids and not new_ids:
+            raise RebuildError(f"sample query returned no results on the new index: {query!r}")
+        overlaps[query] = len(set(live_ids) & set(new_ids)) / len(live_ids) if live_ids else 1.0
+    return {"documents": actual, "sample_overlap": overlaps}
+
+
+def swap_alias(index_client, alias: str, index_name: str) -> None:
+    """Point ``alias`` at ``index_name``; the service applies this atomically."""
+    if not hasattr(index_client, "create_or_update_alias"):
+        raise RebuildError("this azure-search-documents version has no index alias support")
+    index_client.create_or_update_alias(SearchAlias(name=alias, indexes=[index_name]))
+
+
+def retarget_indexer(indexer_client, name: str, index_name: str) -> str:
+    """Point indexer ``name`` at ``index_name`` and return its previous target index."""
+    indexer = indexer_client.get_indexer(name)
+    previous = indexer.target_index_name
+    indexer.target_index_name = index_name
+    indexer_client.create_or_update_indexer(indexer)
+    return previous
+
+
+def run_indexer(indexer_client, name: str, reset: bool = False,
+                timeout: float = INDEXER_TIMEOUT_SECONDS, poll: float = 5.0) -> Dict[str, Any]:
+    """Run indexer ``name`` and wait for that run to finish.
+
+    Without ``reset`` the indexer only processes source documents changed
+    since its last run; ``reset=True`` reprocesses everything (and re-runs
+    any skillset over every document).
+    """
+    last = indexer_client.get_indexer_status(name).last_result
+    previous_start = getattr(last, "start_time", None)
+    if reset:
+        indexer_client.reset_indexer(name)
+    indexer_client.run_indexer(name)
+
+    deadline = time.monotonic() + timeout
+    while True:
+        last = indexer_client.get_indexer_status(name).last_result
+        started = getattr(last, "start_time", None)
+        if last is not None and started != previous_start and last.status not in ("inProgress", "reset"):
+            break
+        if time.monotonic() >= deadline:
+            raise RebuildError(f"indexer '{name}' did not finish within {timeout:.0f}s")
+        time.sleep(poll)
+    if last.status != "success":
+        raise RebuildError(f"indexer '{name}' run ended with {last.status}: {getattr(last, 'error_message', '')}")
+    return {"status": last.status, "items_processed": getattr(last, "item_count", None)}
+
+
+def rebuild_index(index_client, new_index, *, alias: str, fallback_index: str,
+                  sample_queries: Iterable[str] = (), retire: bool = True,
+                  batch_size: int = BATCH_SIZE, validate_timeout: float = VALIDATE_TIMEOUT_SECONDS,
+                  indexer_client=None, indexer_name: Optional[str] = None, reindex: bool = False,
+                  indexer_timeout: float = INDEXER_TIMEOUT_SECONDS, indexer_poll: float = 5.0,
+                  clients_use_alias: bool = False) -> Dict[str, Any]:
+    """Build ``new_index`` alongside the live index and switch ``alias`` to it.
+
+    With ``indexer_client`` and ``indexer_name`` the indexer is moved to the
+    new index and run before validation (``reindex`` resets it first), so
+    documents it ingests keep reaching the index the alias serves. Documents
+    are copied from the live index as well, which keeps fields the indexer
+    does not produce (e.g. ingested ``requirements``). While no alias exists
+    yet the indexer is only moved with ``clients_use_alias``.
+
+    Only indexes previously served through the alias are retired; a legacy
+    index queried by name is kept (no longer updated by the indexer) so
+    clients not yet using the alias keep working.
+    """
+    live = resolve_live_index(index_client, alias, fallback_index)
+    if indexer_client is not None and indexer_name and not live["aliased"] and not clients_use_alias:
+        raise RebuildError(
+            f"index '{live['name']}' is queried by name and its indexer would stop updating it; "
+            f"point clients at alias '{alias}' (AZURE_SEARCH_INDEX) and confirm, or leave the indexer alone"
+        )
+    source = index_client.get_search_client(live["name"])
+
+    index_client.create_index(new_index)
+    previous_target = None
+    indexer_report = None
+    try:
+        target = index_client.get_search_client(new_index.name)
+        copy_documents(source, target, [field.name for field in new_index.fields], batch_size)
+        if indexer_client is not None and indexer_name:
+            previous_target = retarget_indexer(indexer_client, indexer_name, new_index.name)
+            indexer_report = run_indexer(indexer_client, indexer_name, reset=reindex,
+                                         timeout=indexer_timeout, poll=indexer_poll)
+        report = validate(source, target, _key_field(new_index), sample_queries, timeout=validate_timeout)
+        swap_alias(index_client, alias, new_index.name)
+    except Exception as e:
+        if previous_target is not None:
+            retarget_indexer(indexer_client, indexer_name, previous_target)
+        index_client.delete_index(new_index.name)
+        if isinstance(e, RebuildError):
+            raise
+        raise RebuildError(f"{type(e).__name__}: {e}") from e
+
+    retired = None
+    if retire and live["aliased"] and live["name"] != new_index.name:
+        index_client.delete_index(live["name"])
+        retired = live["name"]
+
+    return {
+        "alias": alias,
+        "index": new_index.name,
+        "previous": live["name"],
+        "retired": retired,
+        "indexer": indexer_report,
+        **report,
+    }
+
+
+class LocalSearchClient:
+    """In-memory index contents with a naive term-match ``search``."""
+
+    def __init__(self, index):
+        self.index = index
+        self.key = _key_field(index)
+        self._docs: Dict[str, Dict[str, Any]] = {}
+
+    def upload_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for doc in documents:
+            self._docs[doc[self.key]] = dict(doc)
+        return [{"key": doc[self.key], "succeeded": True} for doc in documents]
+
+    def merge_or_upload_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for doc in documents:
+            self._docs.setdefault(doc[self.key], {}).update(doc)
+        return [{"key": doc[self.key], "succeeded": True} for doc in documents]
+
+    def get_document_count(self) -> int:
+        return len(self._docs)
+
+    def search(self, search_text: Optional[str] = None, top: Optional[int] = None,
+               select: Any = None, **kwargs) -> List[Dict[str, Any]]:
+        terms = [] if search_text in (None, "", "*") else search_text.lower().split()
+        hits = []
+        for doc in self._docs.values():
+            text = " ".join(str(v) for v in doc.values()).lower()
+            score = sum(1 for term in terms if term in text) if terms else 1.0
+            if score:
+                hits.append((score, doc))
+        hits.sort(key=lambda item: item[0], reverse=True)
+        if isinstance(select, str):
+            select = [name.strip() for name in select.split(",")]
+        results = []
+        for score, doc in hits[:top]:
+            row = {k: v for k, v in doc.items() if not select or k in select}
+            row["@search.score"] = float(score)
+            results.append(row)
+        return results
+
+
+class LocalIndexClient:
+    """In-memory stand-in for ``SearchIndexClient`` (indexes, aliases, search clients)."""
+
+    def __init__(self):
+        self._clients: Dict[str, LocalSearchClient] = {}
+        self._aliases: Dict[str, Any] = {}
+
+    def list_index_names(self) -> List[str]:
+        return list(self._clients)
+
+    def create_index(self, index):
+        if index.name in self._clients:
+            raise ValueError(f"index '{index.name}' already exists")
+        self._clients[index.name] = LocalSearchClient(index)
+        return index
+
+    def delete_index(self, index) -> None:
+        name = getattr(index, "name", index)
+        if any(name in alias.indexes for alias in self._aliases.values()):
+            raise ValueError(f"index '{name}' is referenced by an alias")
+        self._clients.pop(name, None)
+
+    def get_search_client(self, index_name: str) -> LocalSearchClient:
+        if index_name in self._aliases:
+            index_name = self._aliases[index_name].indexes[0]
+        if index_name not in self._clients:
+            raise ResourceNotFoundError(f"index '{index_name}' not found")
+        return self._clients[index_name]
+
+    def get_alias(self, name: str):
+        if name not in self._aliases:
+            raise ResourceNotFoundError(f"alias '{name}' not found")
+        return self._aliases[name]
+
+    def create_or_update_alias(self, alias):
+        self._aliases[alias.name] = alias
+        return alias
+
+
+class LocalIndexerClient:
+    """In-memory stand-in for ``SearchIndexerClient``.
+
+    Each indexer "ingests" a fixed list of source documents into its target
+    index on every run (merge-or-upload, like a real indexer).
+    """
+
+    def __init__(self, index_client: LocalIndexClient):
+        self.index_client = index_client
+        self._indexers: Dict[str, Any] = {}
+        self._sources: Dict[str, List[Dict[str, Any]]] = {}
+        self._status: Dict[str, Any] = {}
+        self._runs = 0
+
+    def add_indexer(self, name: str, target_index_name: str, documents: List[Dict[str, Any]]) -> None:
+        self._indexers[name] = SimpleNamespace(name=name, target_index_name=target_index_name)
+        self._sources[name] = documents
+        self._status[name] = SimpleNamespace(last_result=None)
+
+    def get_indexer(self, name: str):
+        if name not in self._indexers:
+            raise ResourceNotFoundError(f"indexer '{name}' not found")
+        indexer = self._indexers[name]
+        return SimpleNamespace(name=indexer.name, target_index_name=indexer.target_index_name)
+
+    def create_or_update_indexer(self, indexer):
+        if indexer.target_index_name not in self.index_client.list_index_names():
+            raise ResourceNotFoundError(f"index '{indexer.target_index_name}' not found")
+        self._indexers[indexer.name] = indexer
+        return indexer
+
+    def reset_indexer(self, name: str) -> None:
+        self.get_indexer(name)
+
+    def run_indexer(self, name: str) -> None:
+        target = self.index_client.get_search_client(self._indexers[name].target_index_name)
+        target.merge_or_upload_documents(self._sources[name])
+        self._runs += 1
+        self._status[name] = SimpleNamespace(last_result=SimpleNamespace(
+            status="success", start_time=self._runs, item_count=len(self._sources[name]), error_message=None))
+
+    def get_indexer_status(self, name: str):
+        return self._status[name]
@@ -0,0 +1,735 @@
+"""Local background job queue for LLM analysis and Pre-ORB workbook generation.
+
+Jobs run on a worker pool and report progress. Status and results are
+persisted under ``RFP_JOB_DIR`` so they survive a browser refresh or a process
+restart. Jobs can be cancelled, and each user has a bounded number of running
+jobs; extra submissions wait in the queue.
+
+Job functions registered with ``@job_function`` have their arguments stored
+next to the record, so any process serving the same job directory
+(``JobQueue.serve``) can claim queued jobs: jobs enqueued by the batch CLI,
+and jobs left queued by a process that exited or restarted. The Streamlit UI
+serves the queue; the per-user limit also counts running jobs of other
+processes (best effort: two processes claiming at the same instant can
+briefly exceed it).
+
+The directory may be shared by several hosts (e.g. scaled-out App Service
+instances on a shared file system). A process is identified by host name,
+pid and a per-run boot id; its ``<host>-<pid>.boot`` marker is refreshed
+every ``RFP_JOB_HEARTBEAT_SECONDS``. Jobs of another host count as owned
+until that host's marker goes stale, so one instance never fails or steals
+the running jobs of another.
+
+Finished records and their result files are deleted after
+``RFP_JOB_RETENTION_DAYS`` (``JobQueue.prune``, run hourly while serving).
+Finished records never change again, so they are parsed once and cached;
+polling re-reads only active records.
+
+    python jobs.py preorb queries.txt --top 5          # enqueue and exit
+    python jobs.py preorb queries.txt --top 5 --wait   # also work on them here
+    python jobs.py work                                # serve the queue without the UI
+    python jobs.py list
+    python jobs.py status <job_id>
+    python jobs.py cancel <job_id>
+    python jobs.py prune
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+JOB_DIR = os.getenv("RFP_JOB_DIR", ".jobs")
+JOB_WORKERS = int(os.getenv("RFP_JOB_WORKERS", "4"))
+JOB_MAX_PER_USER = int(os.getenv("RFP_JOB_MAX_PER_USER", "2"))
+JOB_POLL_SECONDS = float(os.getenv("RFP_JOB_POLL_SECONDS", "2"))
+# Whether the UI claims queued jobs from the directory (off for probes such as the startup benchmark)
+JOB_SERVE = os.getenv("RFP_JOB_SERVE", "true").lower() in ("1", "true", "yes")
+JOB_HEARTBEAT_SECONDS = float(os.getenv("RFP_JOB_HEARTBEAT_SECONDS", "30"))
+# A process on another host is presumed gone once its marker is this old
+JOB_OWNER_STALE_SECONDS = 4 * JOB_HEARTBEAT_SECONDS
+JOB_RETENTION_DAYS = float(os.getenv("RFP_JOB_RETENTION_DAYS", "7"))
+JOB_PRUNE_SECONDS = 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+# Identifies this process run; a restarted container can reuse the same pid,
+# and containers of different hosts sharing the job directory often have the same pids
+HOST = socket.gethostname()
+BOOT_ID = uuid.uuid4().hex
+
+
+# Job functions other processes may run, by name (see ``job_function``)
+JOB_FUNCTIONS: Dict[str, Callable[..., Any]] = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when cancellation was requested."""
+
+
+def job_function(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Register ``fn`` so queued jobs running it can be claimed by any serving process."""
+    JOB_FUNCTIONS[fn.__name__] = fn
+    return fn
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Job:
+    """A single unit of background work.
+
+    Job functions receive the ``Job`` as their first argument and use
+    ``report`` for progress, ``check_cancelled`` between steps and
+    ``save_file`` for binary results such as workbooks. Their return value
+    must be JSON-serializable and becomes the job's ``result``.
+    """
+
+    def __init__(self, job_id: str, kind: str, user: str, params: Dict[str, Any], job_dir: str,
+                 on_update: Callable[["Job"], None]):
+        self.id = job_id
+        self.kind = kind
+        self.user = user
+        self.params = params
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.result_file: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.fn_name: Optional[str] = None
+        # Owning process run; None while a detached job waits to be claimed
+        self.host: Optional[str] = HOST
+        self.pid: Optional[int] = os.getpid()
+        self.boot_id: Optional[str] = BOOT_ID
+        self._job_dir = job_dir
+        self._on_update = on_update
+        self._cancel = threading.Event()
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], job_dir: str, on_update: Callable[["Job"], None]) -> "Job":
+        job = cls(record["id"], record["kind"], record["user"], record.get("params") or {}, job_dir, on_update)
+        job.created_at = record["created_at"]
+        job.fn_name = record.get("fn")
+        return job
+
+    def report(self, progress: float, message: str = "") -> None:
+        self.progress = min(1.0, max(0.0, progress))
+        self.message = message
+        self._on_update(self)
+
+    @property
+    def cancel_requested(self) -> bool:
+        # The marker file lets another process (UI or CLI) cancel this job
+        return self._cancel.is_set() or os.path.exists(_cancel_marker(self._job_dir, self.id))
+
+    def check_cancelled(self) -> None:
+        if self.cancel_requested:
+            raise JobCancelled(self.id)
+
+    def save_file(self, data: bytes, suffix: str) -> str:
+        path = os.path.join(self._job_dir, f"{self.id}{suffix}")
+        with open(path, "wb") as f:
+            f.write(data)
+        self.result_file = path
+        return path
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "user": self.user,
+            "params": self.params,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "result": self.result,
+            "result_file": self.result_file,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "fn": self.fn_name,
+            "host": self.host,
+            "pid": self.pid,
+            "boot_id": self.boot_id,
+        }
+
+
+def _record_path(job_dir: str, job_id: str) -> str:
+    return os.path.join(job_dir, f"{job_id}.json")
+
+
+def _cancel_marker(job_dir: str, job_id: str) -> str:
+    return os.path.join(job_dir, f"{job_id}.cancel")
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _claim_marker(job_dir: str, job_id: str) -> str:
+    return os.path.join(job_dir, f"{job_id}.claim")
+
+
+def _args_path(job_dir: str, job_id: str) -> str:
+    return os.path.join(job_dir, f"{job_id}.args")
+
+
+def _boot_marker(job_dir: str, host: str, pid: int) -> str:
+    return os.path.join(job_dir, f"{host}-{pid}.boot")
+
+
+def _owner_alive(job_dir: str, host: Optional[str], pid: Optional[int], boot_id: Optional[str]) -> bool:
+    """Whether the process run that wrote a record is still alive.
+
+    The ``<host>-<pid>.boot`` marker must still hold the record's boot id
+    (a restarted container often gets the same pid). On this host the pid
+    must also be alive; other hosts' pids cannot be checked, so their
+    marker must have been refreshed recently instead.
+    """
+    if not pid or not boot_id:
+        return False
+    host = host or HOST  # records written before hosts were recorded
+    marker = _boot_marker(job_dir, host, pid)
+    try:
+        with open(marker, encoding="utf-8") as f:
+            if f.read().strip() != boot_id:
+                return False
+        if host == HOST:
+            return _pid_alive(pid)
+        return time.time() - os.path.getmtime(marker) < JOB_OWNER_STALE_SECONDS
+    except OSError:
+        return False
+
+
+class JobQueue:
+    """Worker pool with per-user concurrency limits and on-disk job records."""
+
+    def __init__(self, job_dir: str = JOB_DIR, workers: int = JOB_WORKERS, max_per_user: int = JOB_MAX_PER_USER):
+        self.job_dir = job_dir
+        self.max_per_user = max(1, max_per_user)
+        os.makedirs(job_dir, exist_ok=True)
+        self._boot_marker = _boot_marker(job_dir, HOST, os.getpid())
+        self._heartbeat()
+        self._closed = threading.Event()
+        threading.Thread(target=self._heartbeat_loop, name="rfp-job-heartbeat", daemon=True).start()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="rfp-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._pending: Deque[tuple] = deque()
+        self._running_by_user: Dict[str, int] = {}
+        self._serving = False
+        # job id -> (file identity, parsed record), trusted only for finished records
+        self._records: Dict[str, Tuple[tuple, Dict[str, Any]]] = {}
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args: Any, user: str = "default",
+               params: Optional[Dict[str, Any]] = None, detached: bool = False) -> str:
+        """Queue ``fn(job, *args)`` and return the job id.
+
+        For registered job functions the JSON-serializable ``args`` are stored
+        on disk, so another serving process can take the job over if this one
+        exits first. ``detached=True`` only writes the job to the directory
+        for any serving process (including this one, if serving) to claim.
+        """
+        job = Job(uuid.uuid4().hex, kind, user, params or {}, self.job_dir, self._save)
+        if JOB_FUNCTIONS.get(fn.__name__) is fn:
+            job.fn_name = fn.__name__
+            with open(_args_path(self.job_dir, job.id), "w", encoding="utf-8") as f:
+                json.dump(list(args), f, ensure_ascii=False, default=str)
+        elif detached:
+            raise ValueError(f"{fn.__name__} is not a registered job function")
+        if detached:
+            job.host = job.pid = job.boot_id = None
+            self._save(job)
+            return job.id
+
+        with self._lock:
+            self._jobs[job.id] = job
+            self._pending.append((job, fn, args))
+        self._save(job)
+        self._dispatch()
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record from memory, or from disk for other processes' jobs."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self._load(job_id)
+
+    def list(self, user: Optional[str] = None) -> List[Dict[str, Any]]:
+        records = []
+        for job_id in self._job_ids():
+            record = self.get(job_id)
+            if record and (user is None or record["user"] == user):
+                records.append(record)
+        return sorted(records, key=lambda r: r["created_at"], reverse=True)
+
+    def prune(self, max_age_days: float = JOB_RETENTION_DAYS) -> int:
+        """Delete finished records older than ``max_age_days`` with their files; returns how many."""
+        cutoff = time.time() - max_age_days * 86400
+        pruned = 0
+        for job_id in self._job_ids():
+            record = self._read(job_id)
+            if record is None or record["status"] not in FINISHED:
+                continue
+            if (record.get("finished_at") or record["created_at"]) >= cutoff:
+                continue
+            if record.get("result_file"):
+                _remove(record["result_file"])
+            for path in (_args_path(self.job_dir, job_id), _cancel_marker(self.job_dir, job_id),
+                         _claim_marker(self.job_dir, job_id), _record_path(self.job_dir, job_id)):
+                _remove(path)
+            self._records.pop(job_id, None)
+            pruned += 1
+        # Markers of process runs that are gone
+        for name in os.listdir(self.job_dir):
+            path = os.path.join(self.job_dir, name)
+            if not name.endswith(".boot") or path == self._boot_marker:
+                continue
+            host, _, pid = name[: -len(".boot")].rpartition("-")
+            try:
+                stale = os.path.getmtime(path) < cutoff or (host == HOST and not _pid_alive(int(pid)))
+            except (OSError, ValueError):
+                continue
+            if stale:
+                _remove(path)
+        return pruned
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job immediately or ask a running one to stop."""
+        record = self.get(job_id)
+        if record is None or record["status"] in FINISHED:
+            return False
+
+        if record["status"] == QUEUED and not self._owned(record) and self._claim(job_id):
+            # Unowned queued job (e.g. enqueued by the CLI): cancel it on disk
+            try:
+                record = self._load(job_id)
+                if record is not None and record["status"] == QUEUED:
+                    record.update(status=CANCELLED, finished_at=time.time())
+                    self._write(record)
+                    _remove(_args_path(self.job_dir, job_id))
+                    return True
+            finally:
+                self._release(job_id)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == QUEUED:
+                self._pending = deque(item for item in self._pending if item[0] is not job)
+                job.status = CANCELLED
+                job.finished_at = time.time()
+            elif job is not None:
+                job._cancel.set()
+        if job is not None and job.status == CANCELLED:
+            self._save(job)
+            _remove(_args_path(self.job_dir, job_id))
+            with self._lock:
+                self._jobs.pop(job_id, None)
+        else:
+            open(_cancel_marker(self.job_dir, job_id), "w").close()
+        return True
+
+    def wait(self, job_ids: List[str], timeout: Optional[float] = None, poll: float = 0.5) -> List[Dict[str, Any]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            records = [self.get(job_id) for job_id in job_ids]
+            if all(r is None or r["status"] in FINISHED for r in records):
+                return records
+            if deadline is not None and time.monotonic() >= deadline:
+                return records
+            time.sleep(poll)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._serving = False
+        self._closed.set()
+        self._executor.shutdown(wait=wait)
+
+    def serve(self, poll: float = JOB_POLL_SECONDS) -> None:
+        """Claim queued jobs from the job directory on a background thread (idempotent)."""
+        with self._lock:
+            if self._serving:
+                return
+            self._serving = True
+
+        def _loop():
+            last_prune = 0.0
+            while self._serving:
+                try:
+                    if time.monotonic() - last_prune >= JOB_PRUNE_SECONDS:
+                        last_prune = time.monotonic()
+                        self.prune()
+                    self.claim_pending()
+                    # Other processes' jobs may have finished and freed user slots
+                    self._dispatch()
+                except Exception:
+                    pass  # a bad record must not stop the loop
+                time.sleep(poll)
+
+        threading.Thread(target=_loop, name="rfp-job-claim", daemon=True).start()
+
+    def claim_pending(self) -> int:
+        """Take over queued jobs no live process owns; returns how many were claimed."""
+        claimed = 0
+        elsewhere = self._running_elsewhere()
+        for job_id in sorted(self._job_ids()):
+            with self._lock:
+                if job_id in self._jobs:
+                    continue
+            record = self._load(job_id)
+            if record is None or record["status"] != QUEUED or self._owned(record) or record.get("fn") not in JOB_FUNCTIONS:
+                continue
+            # Only claim what can start now, leaving the rest to other processes
+            user = record["user"]
+            with self._lock:
+                load = self._running_by_user.get(user, 0) + sum(1 for item in self._pending if item[0].user == user)
+            if load + elsewhere.get(user, 0) >= self.max_per_user or not self._claim(job_id):
+                continue
+            # Re-read under the claim; another process may have finished it meanwhile
+            record = self._load(job_id)
+            try:
+                with open(_args_path(self.job_dir, job_id), encoding="utf-8") as f:
+                    args = tuple(json.load(f))
+            except (OSError, ValueError):
+                record = None
+            if record is None or record["status"] != QUEUED:
+                self._release(job_id)
+                continue
+            job = Job.from_record(record, self.job_dir, self._save)
+            with self._lock:
+                self._jobs[job.id] = job
+                self._pending.append((job, JOB_FUNCTIONS[job.fn_name], args))
+            self._save(job)
+            claimed += 1
+        if claimed:
+            self._dispatch()
+        return claimed
+
+    def _heartbeat(self) -> None:
+        # Rewritten rather than touched so a removed marker comes back
+        with open(self._boot_marker, "w", encoding="utf-8") as f:
+            f.write(BOOT_ID)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._closed.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                self._heartbeat()
+            except OSError:
+                pass
+
+    def _owned(self, record: Dict[str, Any]) -> bool:
+        return _owner_alive(self.job_dir, record.get("host"), record.get("pid"), record.get("boot_id"))
+
+    def _claim(self, job_id: str) -> bool:
+        path = _claim_marker(self.job_dir, job_id)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        host, pid, boot_id = f.read().split()
+                except (OSError, ValueError):
+                    return False
+                if _owner_alive(self.job_dir, host, int(pid), boot_id):
+                    return False
+                # Stale claim of a process run that exited
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(f"{HOST} {os.getpid()} {BOOT_ID}")
+            return True
+        return False
+
+    def _release(self, job_id: str) -> None:
+        _remove(_claim_marker(self.job_dir, job_id))
+
+    def _running_elsewhere(self) -> Dict[str, int]:
+        """Running jobs per user in other live processes sharing the job directory."""
+        counts: Dict[str, int] = {}
+        for job_id in self._job_ids():
+            record = self._load(job_id)
+            if record and record["status"] == RUNNING and record.get("boot_id") != BOOT_ID:
+                counts[record["user"]] = counts.get(record["user"], 0) + 1
+        return counts
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+        elsewhere = self._running_elsewhere()
+        with self._lock:
+            waiting: Deque[tuple] = deque()
+            while self._pending:
+                item = self._pending.popleft()
+                user = item[0].user
+                if self._running_by_user.get(user, 0) + elsewhere.get(user, 0) >= self.max_per_user:
+                    waiting.append(item)
+                    continue
+                self._running_by_user[user] = self._running_by_user.get(user, 0) + 1
+                self._executor.submit(self._run, *item)
+            self._pending = waiting
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._save(job)
+        try:
+            job.check_cancelled()
+            result = fn(job, *args)
+            job.check_cancelled()
+            job.result = result
+            job.status = SUCCEEDED
+            job.progress = 1.0
+        except JobCancelled:
+            job.status = CANCELLED
+            job.result = None
+        except Exception as e:
+            job.status = FAILED
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            _remove(_cancel_marker(self.job_dir, job.id))
+            _remove(_args_path(self.job_dir, job.id))
+            self._release(job.id)
+            with self._lock:
+                self._running_by_user[job.user] -= 1
+                self._jobs.pop(job.id, None)
+            self._dispatch()
+
+    def _save(self, job: Job) -> None:
+        self._write(job.to_dict())
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        path = _record_path(self.job_dir, record["id"])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        payload = json.dumps(record, ensure_ascii=False, default=str)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            identity = _identity(os.fstat(f.fileno()))
+        os.replace(tmp_path, path)
+        # The rename keeps inode and mtime, so a finished record is never parsed again
+        self._records[record["id"]] = (identity, json.loads(payload))
+
+    def _job_ids(self) -> List[str]:
+        return [name[: -len(".json")] for name in os.listdir(self.job_dir) if name.endswith(".json")]
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The record as stored; finished records are served from the cache."""
+        path = _record_path(self.job_dir, job_id)
+        try:
+            identity = _identity(os.stat(path))
+            cached = self._records.get(job_id)
+            # Active records may be rewritten within one timestamp tick, so only
+            # finished ones (which are never rewritten) skip parsing
+            if cached is None or cached[0] != identity or cached[1]["status"] not in FINISHED:
+                with open(path, encoding="utf-8") as f:
+                    cached = (_identity(os.fstat(f.fileno())), json.load(f))
+                self._records[job_id] = cached
+        except (OSError, ValueError):
+            self._records.pop(job_id, None)
+            return None
+        return dict(cached[1])
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = self._read(job_id)
+        if record is None:
+            return None
+        # A job left running by a process run that no longer exists was interrupted;
+        # queued jobs of registered functions wait for a serving process to claim them
+        if (record["status"] not in FINISHED and not self._owned(record)
+                and not (record["status"] == QUEUED and record.get("fn") in JOB_FUNCTIONS)):
+            record["status"] = FAILED
+            record["error"] = "interrupted (worker process exited)"
+            record["finished_at"] = record.get("finished_at") or time.time()
+            self._write(record)
+            _remove(_args_path(self.job_dir, job_id))
+        return record
+
+
+def _identity(stat: os.stat_result) -> tuple:
+    # Detects a record deleted by prune and created again
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """Return the process-wide job queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+# --- Job functions -----------------------------------------------------------
+
+@job_function
+def run_analysis(job: Job, documents: List[Any], prompt: str, analyzer_kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate the LLM analysis for ``documents`` and parse the Pre-ORB fields."""
+    from app import RFPAnalyzer
+    from preorb import parse_llm_response
+
+    job.report(0.1, "LLM 호출 중")
+    response_text = RFPAnalyzer(**(analyzer_kwargs or {})).generate_from_documents(documents, prompt=prompt)
+    job.check_cancelled()
+    job.report(0.9, "응답 파싱 중")
+    return {"response": response_text, "parsed": parse_llm_response(response_text)}
+
+
+@job_function
+def run_preorb(job: Job, parsed_data: Dict[str, str]) -> Dict[str, Any]:
+    """Fill the Pre-ORB template with already extracted fields."""
+    from preorb import build_preorb_workbook, preorb_file_name
+
+    job.report(0.2, "템플릿 다운로드 및 작성 중")
+    stream = build_preorb_workbook(parsed_data)
+    job.check_cancelled()
+    job.save_file(stream.getvalue(), ".xlsx")
+    return {"file_name": preorb_file_name(parsed_data)}
+
+
+@job_function
+def run_query_to_preorb(job: Job, query: str, top: int, prompt: str) -> Dict[str, Any]:
+    """Search, analyze and build the Pre-ORB workbook for one query (batch CLI)."""
+    from app import RFPAnalyzer, extract_chunks
+    from preorb import build_preorb_workbook, parse_llm_response, preorb_file_name
+
+    analyzer = RFPAnalyzer()
+    job.report(0.1, "검색 중")
+    documents = analyzer.search(query, top=top)
+    job.check_cancelled()
+    job.report(0.3, "LLM 호출 중")
+    response_text = analyzer.generate_from_documents(extract_chunks(documents), prompt=prompt)
+    job.check_cancelled()
+    parsed = parse_llm_response(response_text)
+    job.report(0.8, "Pre-ORB 작성 중")
+    stream = build_preorb_workbook(parsed)
+    job.check_cancelled()
+    job.save_file(stream.getvalue(), ".xlsx")
+    return {"response": response_text, "parsed": parsed, "file_name": preorb_file_name(parsed)}
+
+
+def _print_record(record: Dict[str, Any]) -> None:
+    detail = record["error"] or record["message"]
+    print(f'{record["id"]}  {record["kind"]:<10} {record["status"]:<9} {record["progress"]:>4.0%}  {detail}')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app import DEFAULT_ANALYSIS_PROMPT
+
+    parser = argparse.ArgumentParser(description="RFP background job queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("preorb", help="enqueue one Pre-ORB generation per query line")
+    batch.add_argument("queries", help="text file with one search query per line")
+    batch.add_argument("--top", type=int, default=5)
+    batch.add_argument("--user", default="batch")
+    batch.add_argument("--wait", action="store_true", help="work on the jobs in this process and wait for them")
+
+    sub.add_parser("work", help="serve the job directory (claim and run queued jobs) until interrupted")
+
+    sub.add_parser("list", help="list jobs in the job directory")
+    status = sub.add_parser("status", help="show one job")
+    status.add_argument("job_id")
+    cancel = sub.add_parser("cancel", help="cancel a queued or running job")
+    cancel.add_argument("job_id")
+    prune = sub.add_parser("prune", help="delete finished jobs older than the retention period")
+    prune.add_argument("--days", type=float, default=JOB_RETENTION_DAYS)
+
+    args = parser.parse_args(argv)
+    queue = get_queue()
+
+    if args.command == "preorb":
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        job_ids = [
+            queue.submit("preorb", run_query_to_preorb, q, args.top, DEFAULT_ANALYSIS_PROMPT,
+                         user=args.user, params={"query": q}, detached=True)
+            for q in queries
+        ]
+        print(f"Queued {len(job_ids)} Pre-ORB jobs in {queue.job_dir}")
+        if not args.wait:
+            print("Any process serving this job directory (the UI or `python jobs.py work`) will run them.")
+            return 0
+        queue.serve()
+        records = queue.wait(job_ids, poll=2.0)
+        for record in records:
+            _print_record(record)
+        return 0 if all(r["status"] == SUCCEEDED for r in records) else 1
+
+    if args.command == "work":
+        queue.serve()
+        print(f"Serving {queue.job_dir} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            return 0
+
+    if args.command == "list":
+        for record in queue.list():
+            _print_record(record)
+        return 0
+
+    if args.command == "status":
+        record = queue.get(args.job_id)
+        if record is None:
+            print(f"Unknown job: {args.job_id}")
+            return 1
+        print(json.dumps(record, ensure_ascii=False, indent=2, default=str))
+        return 0
+
+    if args.command == "cancel":
+        ok = queue.cancel(args.job_id)
+        print("Cancellation requested" if ok else "Job is not running")
+        return 0 if ok else 1
+
+    if args.command == "prune":
+        print(f"Deleted {queue.prune(args.days)} finished jobs")
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Pre-ORB helpers shared by the Streamlit UI, background jobs and CLIs.
+
+Parses the LLM extraction response into Pre-ORB fields and fills the Pre-ORB
+Excel template stored in Azure Blob Storage. Nothing here depends on Streamlit,
+so errors are raised instead of being rendered. openpyxl and the Blob SDK are
+imported only when a workbook is actually built.
+"""
+
+import io
+import os
+import re
+from datetime import datetime
+from typing import Dict
+
+TEMPLATE_BLOB_NAME = "Pre-ORB_사업명_YYMMDD_v1.0.xlsx"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Keys produced by parse_llm_response, in template order
+PREORB_FIELDS = [
+    "사업명", "사업기간", "사업목적/범위", "핵심기술", "고객사명", "사업주관담당자", "사업주관조직",
+    "사업설명회일자", "입찰일자", "PT발표일", "우선협상대상자선정발표일", "주요체크사항",
+]
+
+
+def parse_llm_response(response_text: str) -> Dict[str, str]:
+    """LLM 응답에서 필요한 항목들을 추출"""
+    def extract_value(pattern, text):
+        m = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        return m.group(1).strip() if m else "내용 없음"
+
+    parsed = {
+        "사업명": extract_value(r"사업명[:\s]+(.+?)(?:\n|$)", response_text),
+        "사업기간": extract_value(r"사업\s*기간[:\s]+(.+?)(?:\n|$)", response_text),
+        "사업목적/범위": extract_value(r"사업\s*목적[/\s]*범위[:\s]+(.+?)(?:\n|핵심|$)", response_text),
+        "핵심기술": extract_value(r"핵심\s*기술[:\s]+(.+?)(?:\n|$)", response_text),
+        "고객사명": extract_value(r"고객사명[:\s]+(.+?)(?:\n|$)", response_text),
+        "사업주관담당자": extract_value(r"사업\s*주관\s*담당자[:\s]+(.+?)(?:\n|$)", response_text),
+        "사업주관조직": extract_value(r"사업\s*주관\s*조직[:\s]+(.+?)(?:\n|$)", response_text),
+        "사업설명회일자": extract_value(r"사업\s*설명회\s*일자[:\s]+(.+?)(?:\n|$)", response_text),
+        "입찰일자": extract_value(r"입찰\s*일자[:\s]+(.+?)(?:\n|$)", response_text),
+        "PT발표일": extract_value(r"PT\s*발표일[:\s]+(.+?)(?:\n|$)", response_text),
+        "우선협상대상자선정발표일": extract_value(r"우선\s*협상\s*대상자\s*선정\s*발표일[:\s]+(.+?)(?:\n|$)", response_text),
+        "주요체크사항": extract_value(r"주요\s*체크\s*사항[:\s]+(.+)", response_text)
+    }
+
+    return parsed
+
+
+def preorb_file_name(parsed_data: Dict[str, str]) -> str:
+    """파일명 생성 (Pre-ORB_사업명_날짜_v1.0.xlsx)"""
+    project_name = parsed_data.get("사업명", "사업명")
+    safe_name = re.sub(r'[\\/*?:"<>|]', "", project_name)
+    today_str = datetime.today().strftime("%Y%m%d")
+    return f"Pre-ORB_{safe_name}_{today_str}_v1.0.xlsx"
+
+
+def build_preorb_workbook(parsed_data: Dict[str, str]) -> io.BytesIO:
+    """Azure Blob Storage에서 엑셀 템플릿 다운로드 및 업데이트
+
+    Raises ``ValueError`` when the storage connection string is missing; any
+    download or workbook error propagates to the caller.
+    """
+    import openpyxl
+    from azure.storage.blob import BlobServiceClient
+
+    # Azure Storage 연결 (환경변수에서 가져오기)
+    connect_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+    if not connect_str:
+        raise ValueError("AZURE_STORAGE_CONNECTION_STRING 환경변수가 설정되지 않았습니다.")
+
+    container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME", "templates")
+
+    # Blob 다운로드
+    blob_service_client = BlobServiceClient.from_connection_string(connect_str)
+    blob_client = blob_service_client.get_blob_client(container=container_name, blob=TEMPLATE_BLOB_NAME)
+    blob_data = blob_client.download_blob().readall()
+
+    # openpyxl로 엑셀 파일 로드
+    wb = openpyxl.load_workbook(io.BytesIO(blob_data))
+    ws = wb.active
+
+    # 각 항목명을 찾아서 값 입력
+    for row in ws.iter_rows():
+        for cell in row:
+            cell_value = str(cell.value).strip() if cell.value else ""
+
+            # 각 항목명과 매칭
+            if "사업명" in cell_value and "사업설명회" not in cell_value:
+                cell.offset(column=1).value = parsed_data["사업명"]
+            elif "사업기간" in cell_value or "사업 기간" in cell_value:
+                cell.offset(column=1).value = parsed_data["사업기간"]
+            elif "사업목적" in cell_value or "사업 목적" in cell_value or "범위" in cell_value:
+                cell.offset(column=1).value = parsed_data["사업목적/범위"]
+            elif "핵심기술" in cell_value or "핵심 기술" in cell_value:
+                cell.offset(column=1).value = parsed_data["핵심기술"]
+            elif "고객사명" in cell_value:
+                cell.offset(column=1).value = parsed_data["고객사명"]
+            elif "사업주관담당자" in cell_value or "사업 주관 담당자" in cell_value:
+                cell.offset(column=1).value = parsed_data["사업주관담당자"]
+            elif "사업주관조직" in cell_value or "사업 주관 조직" in cell_value:
+                cell.offset(column=1).value = parsed_data["사업주관조직"]
+            elif "사업설명회일자" in cell_value or "사업설명회 일자" in cell_value:
+                cell.offset(column=1).value = parsed_data["사업설명회일자"]
+            elif "입찰일자" in cell_value or "입찰 일자" in cell_value:
+                cell.offset(column=1).value = parsed_data["입찰일자"]
+            elif "PT발표일" in cell_value or "PT 발표일" in cell_value or "제안 설명회" in cell_value or "제안설명회" in cell_value:
+                cell.offset(column=1).value = parsed_data["PT발표일"]
+            elif "우선협상" in cell_value and "발표일" in cell_value or "우선협상대상자 선정" in cell_value:
+                cell.offset(column=1).value = parsed_data["우선협상대상자선정발표일"]
+            elif "주요체크사항" in cell_value or "주요 체크사항" in cell_value or "주요 체크 사항" in cell_value or "유의 사항" in cell_value:
+                # 주요 체크사항은 아래쪽 셀에 입력
+                cell.offset(row=1).value = parsed_data["주요체크사항"]
+
+    # 메모리에 저장
+    output_stream = io.BytesIO()
+    wb.save(output_stream)
+    output_stream.seek(0)
+
+    return output_stream
@@ -0,0 +1,261 @@
+"""Requirement-level records in the ``requirements`` collection of the RFP index.
+
+Ingestion splits an RFP into individual requirements using the requirement
+IDs of the standard public-sector RFP layout (SFR-001, PER-002, SER-003 ...)
+and merges them into the parent document's ``requirements`` collection:
+
+    python requirement_index.py ingest RFP.pdf --doc-id RFP001
+    python requirement_index.py ingest RFP.pdf --doc-id RFP001 --dry-run
+    python requirement_index.py search "전자서명" --priority-min 2 --type security
+
+Each record holds ``reqId``, ``reqType``, ``category``, ``text``,
+``priority`` (3 = 상/필수, 2 = 중, 1 = 하/선택), ``sourcePage`` (1-based) and
+``relatedReqIds``. ``RFPAnalyzer.search_requirements`` filters on priority and
+type server-side and uses ``rank_requirements`` to return compact records
+instead of whole chunks.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+from rerank import tokenize
+
+# Requirement ID prefixes of the standard RFP requirement tables
+REQ_TYPES = {
+    "SFR": "functional",
+    "FR": "functional",
+    "ECR": "equipment",
+    "PER": "performance",
+    "INR": "interface",
+    "DAR": "data",
+    "TER": "test",
+    "SER": "security",
+    "QUR": "quality",
+    "COR": "constraint",
+    "PMR": "management",
+    "PSR": "support",
+    "NFR": "nonFunctional",
+}
+PRIORITY_LEVELS = {
+    "상": 3, "높음": 3, "필수": 3, "high": 3,
+    "중": 2, "보통": 2, "medium": 2,
+    "하": 1, "낮음": 1, "선택": 1, "low": 1,
+}
+REQ_TEXT_MAX_CHARS = 2000
+# Azure Search limit on complex collection elements per document
+MAX_REQUIREMENTS_PER_DOC = 3000
+# Characters of requirement text returned by search
+COMPACT_TEXT_CHARS = 400
+# Parent documents fetched per requirement search
+REQUIREMENT_DOC_CANDIDATES = 20
+
+# Bounded by letters/digits only: Korean particles attach directly ("SFR-001은")
+REQ_ID_RE = re.compile(r"(?<![A-Za-z0-9])(" + "|".join(sorted(REQ_TYPES, key=len, reverse=True)) + r")[-_ ]?(\d{2,4})(?!\d)")
+_PRIORITY_RE = re.compile(r"(?:우선\s*순위|중요도|priority)\s*[:：]?\s*(상|중|하|높음|보통|낮음|필수|선택|high|medium|low)",
+                          re.IGNORECASE)
+_CATEGORY_RE = re.compile(r"(?:요구사항\s*)?(?:분류|구분)\s*[:：]?\s*([^\n:：]{1,30})")
+# Words every requirement contains; ignored when ranking
+_QUERY_STOPWORDS = frozenset({"요구사항", "요건", "requirement"})
+# Lines referencing other requirements rather than starting a new one
+_REFERENCE_RE = re.compile(r"관련|연관|참조|related", re.IGNORECASE)
+
+
+def normalize_req_id(prefix: str, number: str) -> str:
+    return f"{prefix}-{int(number):03d}"
+
+
+def read_pages(path: str) -> List[str]:
+    """Page texts of a PDF, DOCX (one page) or text file (pages split on form feeds)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        import fitz  # PyMuPDF
+
+        with fitz.open(path) as doc:
+            return [page.get_text() for page in doc]
+    if ext == ".docx":
+        import docx
+
+        document = docx.Document(path)
+        lines = [p.text for p in document.paragraphs]
+        for table in document.tables:
+            for row in table.rows:
+                lines.append(" ".join(cell.text for cell in row.cells))
+        return ["\n".join(lines)]
+    with open(path, encoding="utf-8") as f:
+        return f.read().split("\f")
+
+
+def _block_starts(pages: List[str]):
+    """Yield ``(page_index, offset, req_id, prefix)`` for IDs that open a requirement block."""
+    for page_index, text in enumerate(pages):
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            match = REQ_ID_RE.search(line)
+            if match and not _REFERENCE_RE.search(line[:match.start()]):
+                # The block includes the line's label ("요구사항 고유번호 SFR-001")
+                yield page_index, offset, normalize_req_id(*match.groups()), match.group(1)
+            offset += len(line)
+
+
+def _parse_block(req_id: str, prefix: str, block: str, page: int) -> Dict[str, Any]:
+    priority = _PRIORITY_RE.search(block)
+    category = _CATEGORY_RE.search(block)
+    related = {normalize_req_id(*m.groups()) for m in REQ_ID_RE.finditer(block)} - {req_id}
+    text = " ".join(block.split())
+    return {
+        "reqId": req_id,
+        "reqType": REQ_TYPES[prefix],
+        "category": category.group(1).strip() if category else None,
+        "text": text[:REQ_TEXT_MAX_CHARS],
+        "priority": PRIORITY_LEVELS[priority.group(1).lower()] if priority else None,
+        "sourcePage": page + 1,
+        "relatedReqIds": sorted(related),
+    }
+
+
+def extract_requirements(pages: List[str]) -> List[Dict[str, Any]]:
+    """Split page texts into one record per requirement ID.
+
+    A block runs from an ID to the next block-opening ID, across pages. An ID
+    seen more than once (summary table, then detail page) keeps its longest block.
+    """
+    starts = list(_block_starts(pages))
+    records: Dict[str, Dict[str, Any]] = {}
+    for i, (page, offset, req_id, prefix) in enumerate(starts):
+        end_page, end_offset = (starts[i + 1][0], starts[i + 1][1]) if i + 1 < len(starts) else (len(pages) - 1, None)
+        if end_page == page:
+            block = pages[page][offset:end_offset]
+        else:
+            block = "\n".join([pages[page][offset:]] + pages[page + 1:end_page] + [pages[end_page][:end_offset]])
+        record = _parse_block(req_id, prefix, block, page)
+        if req_id not in records or len(record["text"]) > len(records[req_id]["text"]):
+            records[req_id] = record
+    return list(records.values())[:MAX_REQUIREMENTS_PER_DOC]
+
+
+def ingest(path: str, doc_id: str, search_client) -> int:
+    """Replace the ``requirements`` of document ``doc_id`` with those found in ``path``."""
+    records = extract_requirements(read_pages(path))
+    if records:
+        search_client.merge_or_upload_documents([{"id": doc_id, "requirements": records}])
+    return len(records)
+
+
+def _quote(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def requirement_filter(priority_min: Optional[float] = None, req_types: Optional[Iterable[str]] = None) -> str:
+    """OData filter selecting documents with at least one matching requirement.
+
+    Without conditions it still excludes documents that have no requirements
+    (plain chunks), which would otherwise take the candidate slots.
+    """
+    conditions = []
+    if priority_min is not None:
+        conditions.append(f"r/priority ge {float(priority_min)}")
+    if req_types:
+        conditions.append(f"search.in(r/reqType, '{_quote(','.join(req_types))}', ',')")
+    if not conditions:
+        return "requirements/any()"
+    return f"requirements/any(r: {' and '.join(conditions)})"
+
+
+def _matches(req: Dict[str, Any], priority_min: Optional[float], req_types: Optional[Iterable[str]]) -> bool:
+    if priority_min is not None and (req.get("priority") is None or req["priority"] < priority_min):
+        return False
+    return not req_types or req.get("reqType") in req_types
+
+
+def rank_requirements(query: str, documents: List[Dict[str, Any]], top: int,
+                      priority_min: Optional[float] = None,
+                      req_types: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Flatten the ``requirements`` of search hits into compact records, best first.
+
+    The server-side filter only guarantees one matching requirement per
+    document, so the same filter is applied again per requirement. Records are
+    ranked by query-term coverage, an exact ID mention, priority and finally
+    the parent document's search score.
+    """
+    req_types = set(req_types) if req_types else None
+    query_ids = {normalize_req_id(*m.groups()) for m in REQ_ID_RE.finditer(query.upper())}
+    terms = [t for t in dict.fromkeys(tokenize(REQ_ID_RE.sub(" ", query.upper()))) if t not in _QUERY_STOPWORDS]
+    max_doc_score = max((float(doc.get("@search.score") or 0) for doc in documents), default=0.0)
+
+    scored = []
+    for doc in documents:
+        doc_score = float(doc.get("@search.score") or 0)
+        for req in doc.get("requirements") or []:
+            if not _matches(req, priority_min, req_types):
+                continue
+            haystack = f"{req.get('category') or ''} {req.get('text') or ''}".lower()
+            coverage = sum(1 for term in terms if term in haystack) / len(terms) if terms else 0.0
+            if (terms or query_ids) and not coverage and req.get("reqId") not in query_ids:
+                continue
+            score = (coverage
+                     + (2.0 if req.get("reqId") in query_ids else 0.0)
+                     + 0.1 * (req.get("priority") or 0)
+                     + 0.3 * (doc_score / max_doc_score if max_doc_score > 0 else 0.0))
+            scored.append((score, doc, req))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    results = []
+    for score, doc, req in scored[:top]:
+        text = req.get("text") or ""
+        results.append({
+            "reqId": req.get("reqId"),
+            "reqType": req.get("reqType"),
+            "priority": req.get("priority"),
+            "text": text if len(text) <= COMPACT_TEXT_CHARS else text[:COMPACT_TEXT_CHARS] + "…",
+            "sourcePage": req.get("sourcePage"),
+            "relatedReqIds": req.get("relatedReqIds") or [],
+            "projectName": doc.get("projectName"),
+            "fileName": doc.get("fileName"),
+            "docId": doc.get("id"),
+            "@requirement.score": round(score, 4),
+        })
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Requirement-level indexing and search")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = sub.add_parser("ingest", help="split an RFP into requirements and index them")
+    ingest_parser.add_argument("path", help="RFP file (.pdf, .docx or text)")
+    ingest_parser.add_argument("--doc-id", required=True, help="id of the RFP document in the index")
+    ingest_parser.add_argument("--dry-run", action="store_true", help="print the records instead of uploading")
+
+    search_parser = sub.add_parser("search", help="search individual requirements")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--top", type=int, default=10)
+    search_parser.add_argument("--priority-min", type=float)
+    search_parser.add_argument("--type", action="append", dest="req_types", choices=sorted(set(REQ_TYPES.values())))
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        if args.dry_run:
+            records = extract_requirements(read_pages(args.path))
+            print(json.dumps(records, ensure_ascii=False, indent=2))
+            print(f"{len(records)} requirements", file=sys.stderr)
+            return 0
+        from app import RFPAnalyzer
+
+        count = ingest(args.path, args.doc_id, RFPAnalyzer().search_client)
+        print(f"Indexed {count} requirements into '{args.doc_id}'")
+        return 0
+
+    from app import RFPAnalyzer
+
+    records = RFPAnalyzer().search_requirements(args.query, top=args.top, priority_min=args.priority_min,
+                                                req_types=args.req_types)
+    print(json.dumps(records, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
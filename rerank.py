@@ -0,0 +1,135 @@
+"""Local reranking of Azure Search candidates before generation.
+
+RFPAnalyzer over-fetches a wide candidate set and this module keeps only the
+best ``k`` for the model. Candidates carry only short fields plus highlight
+snippets of the long ones (see ``RFPAnalyzer._search_candidates``). Scoring is
+plain Python over those fields and takes a few milliseconds for ~50 candidates:
+
+- query-term coverage per field, weighted by ``FIELD_BOOSTS``
+- the document ``importance``
+- the normalized ``@search.score`` as a tie breaker
+- a diversity penalty (greedy MMR) against near-duplicate chunks and
+  repeated projects already selected
+"""
+
+import re
+from typing import Any, Dict, FrozenSet, List, Optional
+
+FIELD_BOOSTS: Dict[str, float] = {
+    "projectName": 2.0,
+    "functionalRequirements": 1.5,
+    "technicalRequirements": 1.5,
+    "nonFunctionalRequirements": 1.0,
+    "skillsets": 1.0,
+    "chunk": 2.0,
+}
+IMPORTANCE_WEIGHT = 0.5
+SEARCH_SCORE_WEIGHT = 0.3
+DIVERSITY_PENALTY = 0.6
+
+# Request filler words that carry no retrieval signal
+STOPWORDS = frozenset({
+    "rfp", "문서", "관련", "찾아줘", "찾아", "알려줘", "알려주세요", "주세요", "해주세요",
+    "내용", "대한", "관한", "요약", "무엇", "어떤", "the", "and", "for",
+})
+# Common trailing particles, stripped so "은행의" matches "은행"
+_PARTICLES = ("에서", "으로", "의", "을", "를", "이", "가", "은", "는", "에", "로", "와", "과", "도")
+_TOKEN_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+# Only the head of each chunk is compared for diversity
+_DIVERSITY_CHARS = 1500
+
+
+def tokenize(text: str) -> List[str]:
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        for particle in _PARTICLES:
+            if len(token) > len(particle) + 1 and token.endswith(particle):
+                token = token[: -len(particle)]
+                break
+        if len(token) >= 2 and token not in STOPWORDS:
+            terms.append(token)
+    return terms
+
+
+def _field_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def _importance(doc: Dict[str, Any]) -> float:
+    try:
+        return float(doc.get("importance") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def relevance(query_terms: List[str], doc: Dict[str, Any], max_search_score: float,
+              field_boosts: Dict[str, float] = FIELD_BOOSTS) -> float:
+    """Score one candidate without the diversity term."""
+    coverage = 0.0
+    if query_terms:
+        total_boost = sum(field_boosts.values())
+        for field, boost in field_boosts.items():
+            text = _field_text(doc.get(field)).lower()
+            if text:
+                matched = sum(1 for term in query_terms if term in text)
+                coverage += boost * matched / len(query_terms)
+        coverage /= total_boost
+
+    search_score = float(doc.get("@search.score") or 0)
+    normalized = search_score / max_search_score if max_search_score > 0 else 0.0
+    return coverage + IMPORTANCE_WEIGHT * _importance(doc) + SEARCH_SCORE_WEIGHT * normalized
+
+
+def rerank(query: str, documents: List[Dict[str, Any]], k: int,
+           field_boosts: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Return the best ``k`` of ``documents`` for ``query``, most relevant first.
+
+    Returned documents are copies with an added ``@rerank.score``.
+    """
+    if not documents or k <= 0:
+        return []
+
+    query_terms = list(dict.fromkeys(tokenize(query)))
+    boosts = field_boosts or FIELD_BOOSTS
+    max_search_score = max(float(doc.get("@search.score") or 0) for doc in documents)
+
+    candidates = []
+    for doc in documents:
+        candidates.append({
+            "doc": doc,
+            "score": relevance(query_terms, doc, max_search_score, boosts),
+            # Raw tokens are enough for near-duplicate detection and much cheaper
+            "tokens": frozenset(_TOKEN_RE.findall(_field_text(doc.get("chunk"))[:_DIVERSITY_CHARS].lower())),
+            "project": doc.get("projectName"),
+        })
+
+    # Greedy MMR; each candidate keeps its max similarity to what is already selected
+    selected: List[Dict[str, Any]] = []
+    for candidate in candidates:
+        candidate["similarity"] = 0.0
+    while candidates and len(selected) < k:
+        best = max(candidates, key=lambda c: c["score"] - DIVERSITY_PENALTY * c["similarity"])
+        best["final"] = best["score"] - DIVERSITY_PENALTY * best["similarity"]
+        candidates.remove(best)
+        selected.append(best)
+        for candidate in candidates:
+            same_project = 0.5 if candidate["project"] and candidate["project"] == best["project"] else 0.0
+            candidate["similarity"] = max(candidate["similarity"], same_project,
+                                          _jaccard(candidate["tokens"], best["tokens"]))
+
+    results = []
+    for candidate in selected:
+        doc = dict(candidate["doc"])
+        doc["@rerank.score"] = round(candidate["final"], 4)
+        results.append(doc)
+    return results
@@ -8,7 +8,7 @@ import json
 load_dotenv()
 endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
 key = os.getenv("AZURE_SEARCH_API_KEY")
-INDEXER_NAME = "rfp-syryu-obj-indexer"
+INDEXER_NAME = os.getenv("AZURE_SEARCH_INDEXER", "rfp-syryu-obj-indexer")
 
 if not endpoint or not key:
     print("Missing AZURE_SEARCH_ENDPOINT or AZURE_SEARCH_API_KEY in environment (.env).")
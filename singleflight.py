@@ -0,0 +1,80 @@
+"""Single-flight coalescing of identical in-flight upstream calls.
+
+When several analysts issue the same search or analysis at the same time, the
+first caller (the leader) performs the upstream call and every concurrent
+caller with the same key waits for and shares its result or error. Followers
+give up after ``timeout`` seconds. The leader itself is bounded only by the
+upstream client's request timeout and retries, so callers pass the leader's
+worst case as ``timeout`` (see ``_leader_budget`` in app.py). Nothing is
+cached once the call finishes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+SINGLEFLIGHT_TIMEOUT = float(os.getenv("RFP_SINGLEFLIGHT_TIMEOUT", "120"))
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serializable request parts."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Share one execution of ``fn`` among concurrent callers with the same key."""
+
+    def __init__(self, timeout: float = SINGLEFLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "timeouts": 0, "errors": 0}
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            if not call.done.wait(self.timeout if timeout is None else timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise TimeoutError("timed out waiting for an identical in-flight request")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
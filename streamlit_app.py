@@ -1,15 +1,25 @@
 import streamlit as st
-import pandas as pd
 import json
 from datetime import datetime
-from app import RFPAnalyzer
-import fitz  # PyMuPDF
-import docx  # python-docx
-import openpyxl
-import io
-import re
-from azure.storage.blob import BlobServiceClient
+from app import (
+    RFPAnalyzer,
+    DEFAULT_ANALYSIS_PROMPT,
+    RERANK_CANDIDATES,
+    ADAPTIVE_MAX_DOCS,
+    LATENCY_TARGET_SECONDS,
+    SPECULATIVE_PREFETCH,
+    extract_chunks,
+    discard_speculation,
+    request_stats,
+    warm_up,
+)
 import os
+import uuid
+from doc_store import get_store
+from jobs import FINISHED, JOB_SERVE, SUCCEEDED, get_queue, run_analysis, run_preorb
+from preorb import XLSX_MIME
+from bulk_export import EXTRACTION_COLUMNS, HIT_COLUMNS, archive_search, export, job_extraction_rows, saved_hit_rows, saved_search_files
+import tempfile
 
 # 페이지 설정 및 세션 상태 초기화
 st.set_page_config(page_title="RFP 분석 대시보드", layout="wide")
@@ -17,6 +27,18 @@ st.set_page_config(page_title="RFP 분석 대시보드", layout="wide")
 if "search_history" not in st.session_state:
     st.session_state.search_history = []
 
+# 문서/응답 본문은 프로세스 공용 저장소에 한 번만 보관하고 세션에는 참조(DocRef)만 저장합니다
+store = get_store()
+# CLI로 등록된 작업과 재시작 전 대기 중이던 작업도 이 프로세스에서 처리
+if JOB_SERVE:
+    get_queue().serve()
+
+# 세션 식별자 (speculative 분석 결과와 백그라운드 작업을 세션별로 구분)
+# URL(sid)에 보관하여 브라우저 새로고침 후에도 같은 작업 목록을 다시 찾을 수 있습니다.
+if "session_id" not in st.session_state:
+    st.session_state.session_id = st.query_params.get("sid") or uuid.uuid4().hex
+    st.query_params["sid"] = st.session_state.session_id
+
 st.title("RFP 분석 자동화 — Streamlit UI")
 
 st.markdown(
@@ -57,6 +79,8 @@ def save_to_json(data, filename_prefix="rfp_search"):
 
 def extract_pdf_text(file):
     """PDF 파일에서 텍스트 추출"""
+    import fitz  # PyMuPDF (업로드 시에만 로드)
+
     try:
         with fitz.open(stream=file) as doc:
             text = ""
@@ -68,6 +92,8 @@ def extract_pdf_text(file):
 
 def extract_docx_text(file):
     """DOCX 파일에서 텍스트 추출"""
+    import docx  # python-docx (업로드 시에만 로드)
+
     try:
         doc = docx.Document(file)
         text = "\n".join([p.text for p in doc.paragraphs])
@@ -76,101 +102,29 @@ def extract_docx_text(file):
         return f"(DOCX 파싱 오류: {e})"
 
 
-def parse_llm_response(response_text):
-    """LLM 응답에서 필요한 항목들을 추출"""
-    def extract_value(pattern, text):
-        m = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        return m.group(1).strip() if m else "내용 없음"
-    
-    parsed = {
-        "사업명": extract_value(r"사업명[:\s]+(.+?)(?:\n|$)", response_text),
-        "사업기간": extract_value(r"사업\s*기간[:\s]+(.+?)(?:\n|$)", response_text),
-        "사업목적/범위": extract_value(r"사업\s*목적[/\s]*범위[:\s]+(.+?)(?:\n|핵심|$)", response_text),
-        "핵심기술": extract_value(r"핵심\s*기술[:\s]+(.+?)(?:\n|$)", response_text),
-        "고객사명": extract_value(r"고객사명[:\s]+(.+?)(?:\n|$)", response_text),
-        "사업주관담당자": extract_value(r"사업\s*주관\s*담당자[:\s]+(.+?)(?:\n|$)", response_text),
-        "사업주관조직": extract_value(r"사업\s*주관\s*조직[:\s]+(.+?)(?:\n|$)", response_text),
-        "사업설명회일자": extract_value(r"사업\s*설명회\s*일자[:\s]+(.+?)(?:\n|$)", response_text),
-        "입찰일자": extract_value(r"입찰\s*일자[:\s]+(.+?)(?:\n|$)", response_text),
-        "PT발표일": extract_value(r"PT\s*발표일[:\s]+(.+?)(?:\n|$)", response_text),
-        "우선협상대상자선정발표일": extract_value(r"우선\s*협상\s*대상자\s*선정\s*발표일[:\s]+(.+?)(?:\n|$)", response_text),
-        "주요체크사항": extract_value(r"주요\s*체크\s*사항[:\s]+(.+)", response_text)
-    }
-    
-    return parsed
-
-def download_and_update_excel(parsed_data):
-    """Azure Blob Storage에서 엑셀 템플릿 다운로드 및 업데이트"""
-    try:
-        # Azure Storage 연결 (환경변수에서 가져오기)
-        connect_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-        if not connect_str:
-            st.error("❌ AZURE_STORAGE_CONNECTION_STRING 환경변수가 설정되지 않았습니다.")
-            return None
-        
-        container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME", "templates")
-        blob_name = "Pre-ORB_사업명_YYMMDD_v1.0.xlsx"
-        
-        # Blob 다운로드
-        blob_service_client = BlobServiceClient.from_connection_string(connect_str)
-        blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
-        blob_data = blob_client.download_blob().readall()
-        
-        # openpyxl로 엑셀 파일 로드
-        wb = openpyxl.load_workbook(io.BytesIO(blob_data))
-        ws = wb.active
-        
-        # 각 항목명을 찾아서 값 입력
-        for row in ws.iter_rows():
-            for cell in row:
-                cell_value = str(cell.value).strip() if cell.value else ""
-                
-                # 각 항목명과 매칭
-                if "사업명" in cell_value and "사업설명회" not in cell_value:
-                    cell.offset(column=1).value = parsed_data["사업명"]
-                elif "사업기간" in cell_value or "사업 기간" in cell_value:
-                    cell.offset(column=1).value = parsed_data["사업기간"]
-                elif "사업목적" in cell_value or "사업 목적" in cell_value or "범위" in cell_value:
-                    cell.offset(column=1).value = parsed_data["사업목적/범위"]
-                elif "핵심기술" in cell_value or "핵심 기술" in cell_value:
-                    cell.offset(column=1).value = parsed_data["핵심기술"]
-                elif "고객사명" in cell_value:
-                    cell.offset(column=1).value = parsed_data["고객사명"]
-                elif "사업주관담당자" in cell_value or "사업 주관 담당자" in cell_value:
-                    cell.offset(column=1).value = parsed_data["사업주관담당자"]
-                elif "사업주관조직" in cell_value or "사업 주관 조직" in cell_value:
-                    cell.offset(column=1).value = parsed_data["사업주관조직"]
-                elif "사업설명회일자" in cell_value or "사업설명회 일자" in cell_value:
-                    cell.offset(column=1).value = parsed_data["사업설명회일자"]
-                elif "입찰일자" in cell_value or "입찰 일자" in cell_value:
-                    cell.offset(column=1).value = parsed_data["입찰일자"]
-                elif "PT발표일" in cell_value or "PT 발표일" in cell_value or "제안 설명회" in cell_value or "제안설명회" in cell_value:
-                    cell.offset(column=1).value = parsed_data["PT발표일"]
-                elif "우선협상" in cell_value and "발표일" in cell_value or "우선협상대상자 선정" in cell_value:
-                    cell.offset(column=1).value = parsed_data["우선협상대상자선정발표일"]
-                elif "주요체크사항" in cell_value or "주요 체크사항" in cell_value or "주요 체크 사항" in cell_value or "유의 사항" in cell_value:
-                    # 주요 체크사항은 아래쪽 셀에 입력
-                    cell.offset(row=1).value = parsed_data["주요체크사항"]
-        
-        # 메모리에 저장
-        output_stream = io.BytesIO()
-        wb.save(output_stream)
-        output_stream.seek(0)
-        
-        return output_stream
-        
-    except Exception as e:
-        st.error(f"❌ 엑셀 처리 중 오류 발생: {e}")
-        return None
-
-
-
 with st.sidebar:
     st.header("⚙️ 설정")
     
     # 검색 설정
     st.subheader("검색 옵션")
     top_n = st.number_input("가져올 문서 수 (top N)", min_value=1, max_value=20, value=8)
+    use_rerank = st.checkbox(
+        "🎯 로컬 재순위화",
+        value=False,
+        help="후보 문서를 넓게 가져온 뒤 키워드 일치도·중요도·다양성으로 재정렬하여 상위 N개만 AI 분석에 보냅니다."
+    )
+    rerank_candidates = st.number_input(
+        "재순위화 후보 수", min_value=10, max_value=100, value=RERANK_CANDIDATES, step=10, disabled=not use_rerank
+    )
+    use_adaptive = st.checkbox(
+        "📐 적응형 문서 수",
+        value=False,
+        help="검색 점수가 급격히 떨어지는 지점에서 문서를 자르고, 목표 응답 시간에 맞게 문서 수와 본문 길이를 조정합니다. "
+             f"문서 수는 top N 또는 {ADAPTIVE_MAX_DOCS}개 중 큰 값까지 늘어날 수 있습니다."
+    )
+    latency_target = st.slider(
+        "목표 AI 응답 시간 (초)", min_value=8, max_value=60, value=int(LATENCY_TARGET_SECONDS), disabled=not use_adaptive
+    )
     
     # 키워드 하이라이트
     st.subheader("키워드 하이라이트")
@@ -191,10 +145,65 @@ with st.sidebar:
     # 필터 옵션
     st.subheader("필터")
     min_importance = st.slider("최소 중요도", 0.0, 1.0, 0.0)
+
+    # 기본 분석 미리 생성 (speculative prefetch)
+    st.subheader("AI 분석 옵션")
+    speculative = st.checkbox(
+        "⚡ 기본 분석 미리 생성",
+        value=SPECULATIVE_PREFETCH,
+        help="검색 직후 기본 프롬프트로 AI 분석을 백그라운드에서 미리 실행합니다. 프롬프트나 문서 선택을 바꾸면 결과는 폐기됩니다."
+    )
     
     # 실행 버튼
     run_button = st.button("🔍 검색 실행")
 
+    # 공용 문서 저장소 메모리 사용량
+    with st.expander("💾 문서 저장소 사용량"):
+        store_stats = get_store().stats()
+        st.metric("메모리 상주", f"{store_stats['resident_bytes'] / 1024 / 1024:.1f} MB",
+                  help=f"상한 {store_stats['max_bytes'] / 1024 / 1024:.0f} MB, 초과 시 오래된 항목은 디스크로 이동")
+        st.metric("디스크 이동", f"{store_stats['spilled_bytes'] / 1024 / 1024:.1f} MB")
+        st.caption(f"항목 {store_stats['entries']}개 · 참조 {store_stats['references']}개 · 중복 제거 {store_stats['dedup_hits']}회")
+
+    # 동일 요청 병합(single-flight) 및 미리 생성 통계
+    with st.expander("📈 호출 통계"):
+        stats = request_stats()
+        flight = stats["singleflight"]
+        st.metric("병합된 호출", flight["coalesced"], help="동시에 들어온 동일한 검색/LLM 요청이 하나의 호출을 공유한 횟수")
+        st.caption(f"전체 {flight['calls']}회 · 실제 호출 {flight['executions']}회 · 대기 시간 초과 {flight['timeouts']}회")
+        spec = stats["speculative"]
+        st.caption(f"미리 생성: 시작 {spec['started']} · 사용 {spec['hits']} · 폐기 {spec['discarded']} · 상한으로 생략 {spec['skipped']}")
+
+    # 지금까지의 검색 결과/추출 항목을 한 파일로 내보내기
+    with st.expander("📤 일괄 내보내기"):
+        export_kind = st.radio("대상", ["검색 결과", "추출 항목"], horizontal=True)
+        export_format = st.selectbox("형식", ["xlsx", "csv", "parquet"])
+        if st.button("📦 내보내기 파일 생성"):
+            # 검색 결과와 추출 항목 모두 현재 세션의 것만 내보냅니다
+            if export_kind == "검색 결과":
+                rows, columns = saved_hit_rows(saved_search_files(), st.session_state.session_id), HIT_COLUMNS
+            else:
+                # 추출 항목은 완료된 AI 분석 작업 결과에서 가져옵니다
+                rows, columns = job_extraction_rows(st.session_state.session_id), EXTRACTION_COLUMNS
+            try:
+                with st.spinner("내보내는 중..."):
+                    with tempfile.NamedTemporaryFile(suffix=f".{export_format}", delete=False) as tmp:
+                        export_path = tmp.name
+                    count = export(rows, columns, export_format, export_path)
+                    with open(export_path, "rb") as f:
+                        export_data = f.read()
+                    os.remove(export_path)
+                st.caption(f"{count:,}행")
+                file_tag = "hits" if export_kind == "검색 결과" else "extractions"
+                st.download_button(
+                    "⬇️ 다운로드",
+                    data=export_data,
+                    file_name=f"rfp_{file_tag}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}",
+                    mime={"xlsx": XLSX_MIME, "csv": "text/csv", "parquet": "application/octet-stream"}[export_format],
+                )
+            except Exception as e:
+                st.error(f"❌ 내보내기 실패: {str(e)}")
+
 # 검색 히스토리
 if st.session_state.search_history:
     with st.expander("📜 검색 히스토리"):
@@ -245,8 +254,12 @@ if run_button or use_prefill_and_execute:
         else:
             with st.spinner("🔄 검색 중... Azure Search 호출을 실행합니다"):
                 try:
-                    analyzer = RFPAnalyzer()
-                    raw_docs = analyzer.search(query, top=int(top_n))
+                    analyzer = RFPAnalyzer(speculative=speculative, session_id=st.session_state.session_id)
+                    raw_docs = analyzer.search(
+                        query, top=int(top_n), rerank=use_rerank, candidates=int(rerank_candidates),
+                        adaptive=use_adaptive, latency_target=float(latency_target)
+                    )
+                    context_plan = analyzer.last_context_plan
 
                     # Convert to plain dicts for session storage and display
                     raw_docs = [dict(d) for d in raw_docs]
@@ -259,38 +272,45 @@ if run_button or use_prefill_and_execute:
                     })
 
                     # Prepare display-friendly docs (Korean keys)
+                    # 본문은 따로 저장해 분석용 청크와 같은 항목을 공유하고, 표시용 행에는 넣지 않습니다
+                    body_refs = store.put_many(d.get("chunk") for d in raw_docs)
                     docs_list = []
-                    for d in raw_docs:
+                    for d, body_ref in zip(raw_docs, body_refs):
                         doc_dict = {
                             "프로젝트명": d.get("projectName"),
                             "중요도": float(d.get("importance", 0) or 0),
+                            "점수": d.get("@search.score"),
                             "기능요구사항": d.get("functionalRequirements"),
                             "비기능요구사항": d.get("nonFunctionalRequirements"),
                             "기술요구사항": d.get("technicalRequirements"),
                             "스킬셋": d.get("skillsets", []),
-                            "본문": d.get("chunk")
                         }
                         if float(doc_dict["중요도"]) >= min_importance:
-                            docs_list.append(doc_dict)
+                            docs_list.append((doc_dict, body_ref))
 
                     # 정렬 적용
                     if docs_list:
                         if sort_by == "중요도":
-                            docs_list.sort(key=lambda x: x["중요도"], reverse=True)
+                            docs_list.sort(key=lambda x: x[0]["중요도"], reverse=True)
                         elif sort_by == "프로젝트명":
-                            docs_list.sort(key=lambda x: x["프로젝트명"] or "")
-
+                            docs_list.sort(key=lambda x: x[0]["프로젝트명"] or "")
 
 
-                    chunks = []
-                    for doc in raw_docs:
-                        if isinstance(doc, dict) and "chunk" in doc:
-                            chunks.append(doc["chunk"])
 
-                    st.session_state.last_raw_docs = chunks
-                    st.session_state.last_display_docs = docs_list
-                    # print("############ last_raw_docs:", st.session_state.last_raw_docs)
+                    excerpt_chars = context_plan["excerpt_chars"] if context_plan else None
+                    st.session_state.last_raw_doc_refs = store.put_many(extract_chunks(raw_docs, excerpt_chars))
+                    st.session_state.last_display_doc_refs = store.put_many(doc for doc, _ in docs_list)
+                    st.session_state.last_display_body_refs = [ref for _, ref in docs_list]
+                    # 일괄 내보내기용 검색 결과 보관 (중요도 필터/정렬 전 전체 결과)
+                    archive_search(query, raw_docs, st.session_state.session_id)
                     st.success(f"✅ 검색 완료 — {len(docs_list)}개 문서를 찾았습니다.")
+                    if context_plan:
+                        excerpt_note = f"문서당 최대 {excerpt_chars:,}자" if excerpt_chars else "본문 전체"
+                        st.caption(
+                            f"📐 적응형 선택: 후보 {context_plan['candidates']}개 중 {context_plan['selected']}개 · "
+                            f"{excerpt_note} · 예상 응답 {context_plan['estimated_seconds']}초 "
+                            f"(목표 {context_plan['latency_target']:.0f}초, 기준: {context_plan['reason']})"
+                        )
 
                 except Exception as e:
                     st.error(f"❌ 검색 중 오류가 발생했습니다: {str(e)}")
@@ -298,9 +318,11 @@ if run_button or use_prefill_and_execute:
                         st.warning("⚠️ 환경 변수가 설정되어 있는지 확인해주세요.")
 
 # 문서가 있으면 표시
-if "last_display_docs" in st.session_state and st.session_state.last_display_docs:
+if st.session_state.get("last_display_doc_refs"):
     st.subheader("📑 검색된 문서 (요약)")
-    for i, d in enumerate(st.session_state.last_display_docs, start=1):
+    display_docs = store.get_many(st.session_state.last_display_doc_refs)
+    body_refs = st.session_state.get("last_display_body_refs", [])
+    for i, (d, body_ref) in enumerate(zip(display_docs, body_refs), start=1):
         with st.expander(f"문서 {i}: {d['프로젝트명'] or '제목 없음'} | 중요도: {d['중요도']:.2f}"):
             cols = st.columns(2)
             with cols[0]:
@@ -318,7 +340,7 @@ if "last_display_docs" in st.session_state and st.session_state.last_display_doc
                     skillset_str = ", ".join(d["스킬셋"]) if isinstance(d["스킬셋"], list) else str(d["스킬셋"])
                     st.markdown(highlight_text(skillset_str, highlight_keywords))
                 st.markdown("**🔹 본문 내용**")
-                st.markdown(highlight_text(d["본문"], highlight_keywords))
+                st.markdown(highlight_text(body_ref.get(), highlight_keywords))
 
     # --- 추가 파일 업로드 섹션 (AI 분석 위) ---
     st.markdown("---")
@@ -348,22 +370,18 @@ if "last_display_docs" in st.session_state and st.session_state.last_display_doc
                 "스킬셋": [],
                 "중요도": 0.0
             })
-        st.session_state.uploaded_docs = uploaded_docs
+        st.session_state.uploaded_doc_refs = store.put_many(uploaded_docs)
     else:
-        st.session_state.uploaded_docs = []
+        st.session_state.uploaded_doc_refs = []
 
     # --- LLM 프롬프트 입력 및 실행 섹션 ---
     st.markdown("---")
     st.header("🤖 AI 분석")
     st.write("검색된 문서와 업로드된 문서를 기반으로 LLM에게 추가 질의를 하려면 아래에 질문을 입력하고 'AI 분석 생성' 버튼을 누르세요.")
-    llm_prompt = st.text_area("LLM에 보낼 질문/프롬프트"
-                              , value="RFP 문서를 참고해서 아래 항목에 맞는 내용을 요약해주세요."
-        "사업명, 사업기간, 사업목적/범위, "
-        "핵심 기술, 고객사명, 사업 주관 담당자, 사업 주관 조직, 사업설명회 일자, 입찰 일자, PT발표일, 우선협상 대상자 선정 발표일, "
-        "주요 체크사항을 알려주세요. 단, 해당항목이 없을 경우에는 내용 없음으로 답변해주세요." 
-        "출력은 반드시 요청한 항목명과 그에 상응하는 값만을 포함하도록 해주세요.", height=120)
+    llm_prompt = st.text_area("LLM에 보낼 질문/프롬프트", value=DEFAULT_ANALYSIS_PROMPT, height=120)
     # 기존 검색 문서 + 업로드 문서 합치기
-    all_docs = st.session_state.get("last_raw_docs", []) + st.session_state.get("uploaded_docs", [])
+    last_raw_docs = store.get_many(st.session_state.get("last_raw_doc_refs", []))
+    all_docs = last_raw_docs + store.get_many(st.session_state.get("uploaded_doc_refs", []))
     doc_labels = []
     filtered_docs = []
     for i, doc in enumerate(all_docs):
@@ -379,7 +397,10 @@ if "last_display_docs" in st.session_state and st.session_state.last_display_doc
         help="분석에 포함할 문서를 선택하세요. 기본적으로 모든 문서가 선택됩니다."
     )
     selected_docs = [doc for doc, label in zip(all_docs, doc_labels) if label in selected_labels]
-    
+
+    # 프롬프트나 문서 선택이 기본값과 달라지면 미리 생성 중인 분석은 폐기
+    if llm_prompt != DEFAULT_ANALYSIS_PROMPT or selected_docs != last_raw_docs:
+        discard_speculation(st.session_state.session_id)
     
     gen_button = st.button("🧠 AI 분석 생성")
 
@@ -387,20 +408,20 @@ if "last_display_docs" in st.session_state and st.session_state.last_display_doc
         if not llm_prompt.strip():
             st.error("질문을 입력해주세요.")
         else:
-            with st.spinner("LLM 호출 중... 잠시 기다려 주세요"):
-                try:
-                    analyzer = RFPAnalyzer()
-                    response_text = analyzer.generate_from_documents(selected_docs, prompt=llm_prompt)
-                    st.session_state.last_llm_response = response_text
-                    parsed_data = parse_llm_response(response_text)
-                    st.session_state.parsed_data = parsed_data
-                except Exception as e:
-                    st.error(f"LLM 호출 중 오류가 발생했습니다: {e}")
+            # 백그라운드 작업으로 제출하고 아래 작업 목록에서 진행 상황을 확인합니다
+            job_id = get_queue().submit(
+                "analysis", run_analysis, selected_docs, llm_prompt,
+                {"speculative": speculative, "session_id": st.session_state.session_id},
+                user=st.session_state.session_id,
+                params={"prompt": llm_prompt[:80]},
+            )
+            st.session_state.pending_analysis_job = job_id
+            st.info("🕒 AI 분석 작업이 제출되었습니다. 아래 '백그라운드 작업'에서 진행 상황을 확인하세요.")
 
     # LLM 응답 항상 표시 (접었다 폈다 가능)
-    if "last_llm_response" in st.session_state:
+    if "last_llm_response_ref" in st.session_state:
         with st.expander("🤖 LLM 응답 보기", expanded=False):
-            text = st.session_state.last_llm_response
+            text = st.session_state.last_llm_response_ref.get()
             num_lines = text.count('\n') + 1
             height = min(800, max(120, num_lines * 24))  # 24px per line, 최대 800px 제한
             st.text_area("LLM 응답", value=text, height=height)
@@ -420,26 +441,85 @@ if "last_display_docs" in st.session_state and st.session_state.last_display_doc
     if "parsed_data" in st.session_state and st.session_state.parsed_data:
         st.markdown("---")
         if st.button("📄 Pre-ORB 자료 생성", help="Azure Blob Storage에서 템플릿을 다운로드하고 데이터를 채워 엑셀 파일을 생성합니다"):
-            with st.spinner("Pre-ORB 자료 생성 중..."):
-                excel_stream = download_and_update_excel(st.session_state.parsed_data)
-                
-                if excel_stream:
-                    # 파일명 생성 (사업명_날짜)
-                    project_name = st.session_state.parsed_data.get("사업명", "사업명")
-                    safe_name = re.sub(r'[\\/*?:"<>|]', "", project_name)
-                    today_str = datetime.today().strftime("%Y%m%d")
-                    file_name = f"Pre-ORB_{safe_name}_{today_str}_v1.0.xlsx"
-                    
-                    st.success("✅ Pre-ORB 자료가 생성되었습니다!")
+            get_queue().submit(
+                "preorb", run_preorb, dict(st.session_state.parsed_data),
+                user=st.session_state.session_id,
+                params={"사업명": st.session_state.parsed_data.get("사업명", "")},
+            )
+            st.info("🕒 Pre-ORB 자료 생성 작업이 제출되었습니다. 아래 '백그라운드 작업'에서 다운로드할 수 있습니다.")
+else:
+    st.info("검색을 먼저 실행하면 문서 목록이 여기 표시됩니다. 그 다음 LLM에 질문을 보내 추가 분석을 받을 수 있습니다.")
+
+
+def load_analysis_result(record):
+    """완료된 분석 작업 결과를 세션에 불러오기"""
+    st.session_state.last_llm_response_ref = store.put(record["result"]["response"])
+    st.session_state.parsed_data = record["result"]["parsed"]
+
+
+# --- 백그라운드 작업 목록 (분석 / Pre-ORB 생성) ---
+job_records = get_queue().list(user=st.session_state.session_id)
+jobs_active = any(r["status"] not in FINISHED for r in job_records)
+
+
+@st.fragment(run_every=2 if jobs_active else None)
+def render_jobs():
+    """작업 상태를 주기적으로 조회하여 표시"""
+    queue = get_queue()
+    records = queue.list(user=st.session_state.session_id)
+    if not records:
+        return
+
+    st.markdown("---")
+    st.subheader("🗂️ 백그라운드 작업")
+
+    # 방금 제출한 분석 작업이 끝나면 결과를 자동으로 불러옵니다
+    pending_id = st.session_state.get("pending_analysis_job")
+    pending = next((r for r in records if r["id"] == pending_id), None)
+    if pending and pending["status"] in FINISHED:
+        del st.session_state["pending_analysis_job"]
+        if pending["status"] == SUCCEEDED:
+            load_analysis_result(pending)
+            st.rerun()
+
+    for record in records[:10]:
+        label = "AI 분석" if record["kind"] == "analysis" else "Pre-ORB 생성"
+        created = datetime.fromtimestamp(record["created_at"]).strftime("%H:%M:%S")
+        cols = st.columns([4, 2])
+        with cols[0]:
+            st.progress(record["progress"], text=f"[{created}] {label} — {record['status']} {record['message']}")
+            if record["error"]:
+                st.error(record["error"])
+        with cols[1]:
+            if record["status"] not in FINISHED:
+                if st.button("⏹️ 취소", key=f"cancel_{record['id']}"):
+                    queue.cancel(record["id"])
+            elif record["status"] == SUCCEEDED and record["kind"] == "analysis":
+                if st.button("📥 결과 불러오기", key=f"load_{record['id']}"):
+                    load_analysis_result(record)
+                    st.rerun()
+                if st.button("📄 Pre-ORB 자료 생성", key=f"preorb_{record['id']}"):
+                    queue.submit(
+                        "preorb", run_preorb, record["result"]["parsed"],
+                        user=st.session_state.session_id,
+                        params={"사업명": record["result"]["parsed"].get("사업명", "")},
+                    )
+                    st.rerun()
+            elif record["status"] == SUCCEEDED and record["result_file"] and os.path.exists(record["result_file"]):
+                with open(record["result_file"], "rb") as f:
                     st.download_button(
                         label="📥 Pre-ORB 엑셀 다운로드",
-                        data=excel_stream.getvalue(),
-                        file_name=file_name,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        data=f.read(),
+                        file_name=record["result"]["file_name"],
+                        mime=XLSX_MIME,
+                        key=f"download_{record['id']}",
                     )
-else:
-    st.info("검색을 먼저 실행하면 문서 목록이 여기 표시됩니다. 그 다음 LLM에 질문을 보내 추가 분석을 받을 수 있습니다.")
+
+
+render_jobs()
 
 st.markdown("---")
 # st.caption("환경변수: AZURE_SEARCH_API_KEY, AZURE_SEARCH_ENDPOINT, AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT, AZURE_DEPLOYMENT_MODEL 필요")
 
+# 첫 화면 렌더링 이후 Azure SDK 로드 및 클라이언트 초기화를 백그라운드에서 미리 수행
+warm_up()
@@ -0,0 +1,41 @@
+import json
+
+from bulk_export import archive_search, saved_hit_rows, saved_search_files
+
+DOCS = [
+    {"projectName": "은행 BPR", "importance": 0.4, "@search.score": 3.0, "skillsets": ["Java", "Oracle"]},
+    {"projectName": "전자계약", "importance": 0.9, "@search.score": 2.0},
+]
+
+
+def archived(directory):
+    return saved_search_files([str(directory / "rfp_search_*.json")])
+
+
+def test_archive_keeps_search_order_and_every_hit(tmp_path):
+    path = archive_search("은행", DOCS, "s1", directory=str(tmp_path))
+
+    rows = list(saved_hit_rows([path]))
+
+    assert [(r["rank"], r["projectName"], r["score"]) for r in rows] == [(1, "은행 BPR", 3.0), (2, "전자계약", 2.0)]
+    assert rows[0]["skillsets"] == "Java, Oracle"
+
+
+def test_archive_drops_oldest_files_beyond_the_cap(tmp_path):
+    for i in range(5):
+        archive_search(f"q{i}", DOCS, "s1", directory=str(tmp_path), max_files=3)
+
+    queries = [json.loads(open(p, encoding="utf-8").read())["query"] for p in archived(tmp_path)]
+
+    assert queries == ["q2", "q3", "q4"]
+
+
+def test_saved_hits_are_scoped_to_the_session(tmp_path):
+    archive_search("mine", DOCS, "s1", directory=str(tmp_path))
+    archive_search("theirs", DOCS, "s2", directory=str(tmp_path))
+    legacy = tmp_path / "rfp_search_20250101_000000.json"
+    legacy.write_text(json.dumps({"query": "legacy", "documents": [{"프로젝트명": "구버전", "점수": 1.0}]}),
+                      encoding="utf-8")
+
+    assert {r["query"] for r in saved_hit_rows(archived(tmp_path), "s1")} == {"mine"}
+    assert {r["query"] for r in saved_hit_rows(archived(tmp_path))} == {"mine", "theirs", "legacy"}
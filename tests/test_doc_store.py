@@ -0,0 +1,75 @@
+import gc
+import os
+import threading
+
+from doc_store import DocumentStore
+
+CHUNK = "전자계약 시스템 구축 " * 50
+
+
+def make_store(tmp_path, max_bytes=1 << 20):
+    return DocumentStore(max_bytes=max_bytes, spill_dir=str(tmp_path))
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = make_store(tmp_path)
+
+    first = store.put(CHUNK)
+    second = store.put(CHUNK)
+    other = store.put({"프로젝트명": "은행 BPR"})
+
+    assert first.id == second.id != other.id
+    stats = store.stats()
+    assert (stats["entries"], stats["references"], stats["dedup_hits"]) == (2, 3, 1)
+    assert first.get() == CHUNK
+
+
+def test_collected_handles_release_the_entry(tmp_path):
+    store = make_store(tmp_path)
+    refs = [store.put(CHUNK), store.put(CHUNK)]
+
+    refs.pop()
+    gc.collect()
+    assert store.stats()["references"] == 1 and store.stats()["entries"] == 1
+
+    refs.pop()
+    gc.collect()
+    assert store.stats()["entries"] == 0 and store.resident_bytes == 0
+
+
+def test_release_from_a_finalizer_while_the_lock_is_held(tmp_path):
+    store = make_store(tmp_path)
+    refs = [store.put(CHUNK)]
+    done = threading.Event()
+
+    def collect_under_lock():
+        # A finalizer may run during any allocation, including inside put()
+        with store._lock:
+            refs.clear()
+            gc.collect()
+        done.set()
+
+    thread = threading.Thread(target=collect_under_lock)
+    thread.start()
+    thread.join(5)
+
+    assert done.is_set()
+    assert store.stats()["entries"] == 0
+
+
+def test_spill_and_load_round_trip(tmp_path):
+    store = make_store(tmp_path, max_bytes=len(CHUNK.encode("utf-8")) * 2)
+    docs = [{"id": i, "본문": CHUNK} for i in range(3)]
+    refs = store.put_many(docs)
+
+    stats = store.stats()
+    assert stats["spilled_entries"] >= 1 and stats["resident_bytes"] <= store.max_bytes
+    assert os.listdir(store.spill_dir)
+
+    assert [ref.get() for ref in refs] == docs
+    assert store.stats()["loads"] >= 1
+
+    refs.clear()
+    gc.collect()
+    assert store.stats()["entries"] == 0
+    assert os.listdir(store.spill_dir) == []
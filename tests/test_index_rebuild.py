@@ -0,0 +1,166 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("azure.core")
+
+from index_rebuild import LocalIndexClient, LocalIndexerClient, RebuildError, rebuild_index  # noqa: E402
+
+LEGACY = "rfp-obj"
+ALIAS = "rfp"
+INDEXER = "rfp-obj-indexer"
+DOCS = [
+    {"id": "RFP001", "projectName": "은행 BPR 구축"},
+    {"id": "RFP002", "projectName": "전자계약 시스템"},
+]
+
+
+def make_index(name):
+    return SimpleNamespace(name=name, fields=[
+        SimpleNamespace(name="id", key=True),
+        SimpleNamespace(name="projectName", key=False),
+        SimpleNamespace(name="requirements", key=False),
+    ])
+
+
+@pytest.fixture
+def services():
+    index_client = LocalIndexClient()
+    index_client.create_index(make_index(LEGACY))
+    index_client.get_search_client(LEGACY).upload_documents(DOCS)
+    indexer_client = LocalIndexerClient(index_client)
+    indexer_client.add_indexer(INDEXER, LEGACY, list(DOCS))
+    return index_client, indexer_client
+
+
+def rebuild(index_client, indexer_client, name, **kwargs):
+    kwargs.setdefault("clients_use_alias", True)
+    return rebuild_index(index_client, make_index(name), alias=ALIAS, fallback_index=LEGACY,
+                         indexer_client=indexer_client, indexer_name=INDEXER, indexer_poll=0, **kwargs)
+
+
+def test_first_rebuild_swaps_alias_and_keeps_legacy_index(services):
+    index_client, indexer_client = services
+
+    summary = rebuild(index_client, indexer_client, "rfp-obj-v1", sample_queries=["은행"])
+
+    assert index_client.get_alias(ALIAS).indexes == ["rfp-obj-v1"]
+    assert summary["previous"] == LEGACY
+    assert summary["retired"] is None
+    assert LEGACY in index_client.list_index_names()
+    assert index_client.get_search_client(ALIAS).get_document_count() == 2
+
+
+def test_later_rebuild_retires_previous_aliased_index(services):
+    index_client, indexer_client = services
+    rebuild(index_client, indexer_client, "rfp-obj-v1")
+
+    summary = rebuild(index_client, indexer_client, "rfp-obj-v2")
+
+    assert summary["retired"] == "rfp-obj-v1"
+    assert "rfp-obj-v1" not in index_client.list_index_names()
+    assert index_client.get_alias(ALIAS).indexes == ["rfp-obj-v2"]
+
+
+def test_keep_old_does_not_retire(services):
+    index_client, indexer_client = services
+    rebuild(index_client, indexer_client, "rfp-obj-v1")
+
+    summary = rebuild(index_client, indexer_client, "rfp-obj-v2", retire=False)
+
+    assert summary["retired"] is None
+    assert "rfp-obj-v1" in index_client.list_index_names()
+
+
+def test_indexer_follows_the_alias(services):
+    index_client, indexer_client = services
+    rebuild(index_client, indexer_client, "rfp-obj-v1")
+    assert indexer_client.get_indexer(INDEXER).target_index_name == "rfp-obj-v1"
+
+    # A newly ingested RFP reaches the served index and survives the next rebuild
+    indexer_client._sources[INDEXER].append({"id": "RFP003", "projectName": "차세대 카드"})
+    indexer_client.run_indexer(INDEXER)
+    assert index_client.get_search_client(ALIAS).get_document_count() == 3
+
+    rebuild(index_client, indexer_client, "rfp-obj-v2")
+    assert indexer_client.get_indexer(INDEXER).target_index_name == "rfp-obj-v2"
+    assert index_client.get_search_client(ALIAS).get_document_count() == 3
+
+
+def test_fields_not_produced_by_the_indexer_are_copied(services):
+    index_client, indexer_client = services
+    index_client.get_search_client(LEGACY).merge_or_upload_documents(
+        [{"id": "RFP001", "requirements": [{"reqId": "SFR-001"}]}])
+
+    rebuild(index_client, indexer_client, "rfp-obj-v1")
+
+    docs = {doc["id"]: doc for doc in index_client.get_search_client(ALIAS).search("*")}
+    assert docs["RFP001"]["requirements"] == [{"reqId": "SFR-001"}]
+
+
+def test_failed_indexer_run_cleans_up(services, monkeypatch):
+    index_client, indexer_client = services
+
+    def fail(name):
+        raise RuntimeError("indexer busy")
+
+    monkeypatch.setattr(indexer_client, "run_indexer", fail)
+    with pytest.raises(RebuildError, match="indexer busy"):
+        rebuild(index_client, indexer_client, "rfp-obj-v1")
+
+    assert index_client.list_index_names() == [LEGACY]
+    assert indexer_client.get_indexer(INDEXER).target_index_name == LEGACY
+    with pytest.raises(Exception):
+        index_client.get_alias(ALIAS)
+
+
+def test_failed_swap_leaves_live_alias_untouched(services, monkeypatch):
+    index_client, indexer_client = services
+    rebuild(index_client, indexer_client, "rfp-obj-v1")
+
+    def fail(alias):
+        raise RuntimeError("alias update rejected")
+
+    monkeypatch.setattr(index_client, "create_or_update_alias", fail)
+    with pytest.raises(RebuildError, match="alias update rejected"):
+        rebuild(index_client, indexer_client, "rfp-obj-v2")
+
+    assert "rfp-obj-v2" not in index_client.list_index_names()
+    assert index_client.get_alias(ALIAS).indexes == ["rfp-obj-v1"]
+    assert indexer_client.get_indexer(INDEXER).target_index_name == "rfp-obj-v1"
+
+
+def test_missing_documents_abort_the_rebuild(services, monkeypatch):
+    index_client, indexer_client = services
+    monkeypatch.setattr("index_rebuild.copy_documents", lambda *args, **kwargs: 0)
+    # The indexer only re-delivers one of the two live documents
+    indexer_client._sources[INDEXER] = DOCS[:1]
+
+    with pytest.raises(RebuildError, match="document count mismatch"):
+        rebuild(index_client, indexer_client, "rfp-obj-v1", validate_timeout=0)
+
+    assert index_client.list_index_names() == [LEGACY]
+
+
+def test_first_rebuild_keeps_indexer_on_legacy_index_unless_confirmed(services):
+    index_client, indexer_client = services
+
+    with pytest.raises(RebuildError, match="queried by name"):
+        rebuild(index_client, indexer_client, "rfp-obj-v1", clients_use_alias=False)
+
+    assert index_client.list_index_names() == [LEGACY]
+    assert indexer_client.get_indexer(INDEXER).target_index_name == LEGACY
+
+    # Without the indexer the legacy index keeps being fed, so no confirmation is needed
+    summary = rebuild(index_client, None, "rfp-obj-v1", clients_use_alias=False)
+    assert summary["index"] == "rfp-obj-v1" and summary["indexer"] is None
+    assert indexer_client.get_indexer(INDEXER).target_index_name == LEGACY
+
+
+def test_later_rebuilds_move_the_indexer_without_confirmation(services):
+    index_client, indexer_client = services
+    rebuild(index_client, indexer_client, "rfp-obj-v1")
+
+    rebuild(index_client, indexer_client, "rfp-obj-v2", clients_use_alias=False)
+
+    assert indexer_client.get_indexer(INDEXER).target_index_name == "rfp-obj-v2"
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import jobs
+from jobs import BOOT_ID, CANCELLED, FAILED, HOST, QUEUED, RUNNING, SUCCEEDED, JobQueue, job_function
+
+gate = threading.Event()
+
+
+@job_function
+def echo_job(job, value):
+    return {"value": value}
+
+
+@job_function
+def gated_job(job, value):
+    while not gate.wait(0.01):
+        job.check_cancelled()
+    return {"value": value}
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    gate.clear()
+    queues = []
+
+    def make(**kwargs):
+        queue = JobQueue(job_dir=str(tmp_path), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    gate.set()
+    for queue in queues:
+        queue.shutdown()
+
+
+def write_record(job_dir, job_id, status, user="u", fn=None, host=HOST, pid=None, boot_id=None, **extra):
+    record = {"id": job_id, "kind": "preorb", "user": user, "params": {}, "status": status, "progress": 0.0,
+              "message": "", "error": None, "result": None, "result_file": None, "created_at": time.time(),
+              "started_at": None, "finished_at": None, "fn": fn, "host": host, "pid": pid, "boot_id": boot_id}
+    record.update(extra)
+    with open(os.path.join(job_dir, f"{job_id}.json"), "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    if fn:
+        with open(os.path.join(job_dir, f"{job_id}.args"), "w", encoding="utf-8") as f:
+            json.dump(["x"], f)
+
+
+def statuses(queue, job_ids):
+    return [queue.get(job_id)["status"] for job_id in job_ids]
+
+
+def wait_for(queue, job_ids, status):
+    deadline = time.monotonic() + 5
+    while statuses(queue, job_ids) != [status] * len(job_ids) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return statuses(queue, job_ids)
+
+
+def test_per_user_limit_queues_extra_jobs(make_queue):
+    queue = make_queue(max_per_user=1)
+    first = queue.submit("preorb", gated_job, 1, user="a")
+    second = queue.submit("preorb", gated_job, 2, user="a")
+    other = queue.submit("preorb", gated_job, 3, user="b")
+
+    assert wait_for(queue, [first, other], RUNNING) == [RUNNING, RUNNING]
+    assert queue.get(second)["status"] == QUEUED
+
+    gate.set()
+    assert [r["status"] for r in queue.wait([first, second, other], timeout=5, poll=0.01)] == [SUCCEEDED] * 3
+    assert queue.get(second)["result"] == {"value": 2}
+
+
+def test_cancel_queued_and_running_jobs(make_queue):
+    queue = make_queue(max_per_user=1)
+    running = queue.submit("preorb", gated_job, 1)
+    queued = queue.submit("preorb", gated_job, 2)
+    wait_for(queue, [running], RUNNING)
+
+    assert queue.cancel(queued)
+    assert queue.get(queued)["status"] == CANCELLED
+    assert not os.path.exists(os.path.join(queue.job_dir, f"{queued}.args"))
+
+    assert queue.cancel(running)
+    assert wait_for(queue, [running], CANCELLED) == [CANCELLED]
+    assert not queue.cancel(running)
+
+
+def test_detached_job_is_claimed_once(make_queue):
+    submitter, first, second = make_queue(), make_queue(), make_queue()
+    job_id = submitter.submit("preorb", echo_job, "x", detached=True)
+    assert submitter.get(job_id)["pid"] is None
+
+    assert first.claim_pending() + second.claim_pending() == 1
+    assert submitter.wait([job_id], timeout=5, poll=0.01)[0]["result"] == {"value": "x"}
+    # The claim is released right after the final record is written
+    claim = os.path.join(submitter.job_dir, f"{job_id}.claim")
+    deadline = time.monotonic() + 5
+    while os.path.exists(claim) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not os.path.exists(claim)
+
+
+def test_cancel_unowned_queued_job_on_disk(make_queue):
+    queue = make_queue()
+    job_id = queue.submit("preorb", echo_job, "x", detached=True)
+
+    assert queue.cancel(job_id)
+    assert queue.get(job_id)["status"] == CANCELLED
+    assert queue.claim_pending() == 0
+
+
+def test_restart_fails_running_jobs_and_reclaims_queued(make_queue, tmp_path):
+    queue = make_queue()
+    # Same host and pid, but an earlier process run
+    write_record(str(tmp_path), "running", RUNNING, fn="echo_job", pid=os.getpid(), boot_id="previous")
+    write_record(str(tmp_path), "queued", QUEUED, fn="echo_job", pid=os.getpid(), boot_id="previous")
+
+    record = queue.get("running")
+    assert record["status"] == FAILED and "interrupted" in record["error"]
+    assert not os.path.exists(tmp_path / "running.args")
+
+    assert queue.claim_pending() == 1
+    assert queue.wait(["queued"], timeout=5, poll=0.01)[0]["status"] == SUCCEEDED
+
+
+def test_other_host_jobs_stay_owned_and_count_toward_limit(make_queue, tmp_path):
+    queue = make_queue(max_per_user=1)
+    (tmp_path / f"other-{os.getpid()}.boot").write_text("remote")
+    write_record(str(tmp_path), "remote", RUNNING, host="other", pid=os.getpid(), boot_id="remote")
+    write_record(str(tmp_path), "waiting", QUEUED, fn="echo_job")
+
+    assert queue.get("remote")["status"] == RUNNING
+    assert queue.claim_pending() == 0
+
+    # The other host stopped refreshing its marker
+    os.utime(tmp_path / f"other-{os.getpid()}.boot", (0, 0))
+    assert queue.get("remote")["status"] == FAILED
+    assert queue.claim_pending() == 1
+
+
+def test_prune_removes_old_finished_jobs(make_queue, tmp_path):
+    queue = make_queue()
+    old = time.time() - 10 * 86400
+    result_file = tmp_path / "old.xlsx"
+    result_file.write_bytes(b"xlsx")
+    write_record(str(tmp_path), "old", SUCCEEDED, finished_at=old, result_file=str(result_file))
+    write_record(str(tmp_path), "recent", SUCCEEDED, finished_at=time.time())
+    write_record(str(tmp_path), "stuck", RUNNING, pid=os.getpid(), boot_id=BOOT_ID, created_at=old)
+    (tmp_path / f"{HOST}-999999999.boot").write_text("gone")
+
+    assert queue.prune(max_age_days=7) == 1
+    assert sorted(r["id"] for r in queue.list()) == ["recent", "stuck"]
+    assert not result_file.exists()
+    assert not (tmp_path / f"{HOST}-999999999.boot").exists()
+
+
+def test_unchanged_records_are_not_parsed_again(make_queue, tmp_path, monkeypatch):
+    queue = make_queue()
+    for i in range(5):
+        write_record(str(tmp_path), f"done{i}", SUCCEEDED, finished_at=time.time())
+    queue.list()
+
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(jobs.json, "load", lambda f: loads.append(f.name) or real_load(f))
+    queue.list()
+    queue.claim_pending()
+
+    assert loads == []
@@ -0,0 +1,40 @@
+from requirement_index import extract_requirements, rank_requirements, requirement_filter
+
+DOCS = [
+    {"id": "RFP001", "projectName": "전자계약시스템 구축", "@search.score": 2.0, "requirements": [
+        {"reqId": "SFR-001", "reqType": "functional", "text": "전자계약 생성 및 관리", "priority": 3},
+        {"reqId": "SFR-002", "reqType": "functional", "text": "계약 승인 워크플로우", "priority": 2},
+        {"reqId": "SER-001", "reqType": "security", "text": "PKI 기반 전자서명", "priority": 3},
+    ]},
+]
+
+
+def test_query_id_with_attached_particle():
+    results = rank_requirements("SFR-002의 내용", DOCS, 5)
+
+    assert results[0]["reqId"] == "SFR-002"
+
+
+def test_ingest_ids_with_attached_particles():
+    pages = [
+        "SFR-001은 전자계약을 생성한다\n우선순위: 상\n",
+        "SFR-002는 계약 승인을 처리한다 (관련: SFR-001과 연계)\n",
+    ]
+
+    records = {r["reqId"]: r for r in extract_requirements(pages)}
+
+    assert sorted(records) == ["SFR-001", "SFR-002"]
+    assert records["SFR-001"]["priority"] == 3
+    assert records["SFR-002"]["relatedReqIds"] == ["SFR-001"]
+
+
+def test_ids_are_not_matched_inside_longer_tokens():
+    pages = ["XSFR-001 참고 코드\nSFR-0012345 일련번호\n"]
+
+    assert extract_requirements(pages) == []
+
+
+def test_filter_always_requires_requirements():
+    assert requirement_filter() == "requirements/any()"
+    assert requirement_filter(2) == "requirements/any(r: r/priority ge 2.0)"
+    assert requirement_filter(None, ["security"]) == "requirements/any(r: search.in(r/reqType, 'security', ','))"
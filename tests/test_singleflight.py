@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def start_followers(flight, key, fn, count, timeout=None):
+    results, errors = [], []
+
+    def follow():
+        try:
+            results.append(flight.do(key, fn, timeout=timeout))
+        except BaseException as e:  # noqa: BLE001 - collected for assertions
+            errors.append(e)
+
+    threads = [threading.Thread(target=follow) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def wait_until_coalesced(flight, count):
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return {"answer": 42}
+
+    leader, leader_results, _ = start_followers(flight, "k", fn, 1)
+    while not calls:
+        time.sleep(0.01)
+    threads, results, errors = start_followers(flight, "k", fn, 3)
+    wait_until_coalesced(flight, 3)
+    release.set()
+    for thread in leader + threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert leader_results + results == [{"answer": 42}] * 4 and not errors
+    assert flight.stats() == {"calls": 4, "executions": 1, "coalesced": 3, "timeouts": 0, "errors": 0,
+                              "in_flight": 0}
+
+
+def test_leader_error_is_shared_and_the_key_is_cleared():
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream failed")
+
+    leader, _, leader_errors = start_followers(flight, "k", fail, 1)
+    started.wait(5)
+    threads, _, errors = start_followers(flight, "k", fail, 2)
+    wait_until_coalesced(flight, 2)
+    release.set()
+    for thread in leader + threads:
+        thread.join(5)
+
+    assert [type(e) for e in leader_errors + errors] == [ValueError] * 3
+    assert flight.stats()["errors"] == 1 and flight.stats()["in_flight"] == 0
+    # The failed call is not remembered
+    assert flight.do("k", lambda: "retried") == "retried"
+
+
+def test_follower_gives_up_after_timeout():
+    flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    leader, leader_results, _ = start_followers(flight, "k", slow, 1)
+    started.wait(5)
+
+    with pytest.raises(TimeoutError):
+        flight.do("k", slow)
+    with pytest.raises(TimeoutError):
+        flight.do("k", slow, timeout=0.01)
+
+    release.set()
+    leader[0].join(5)
+    assert leader_results == ["late"]
+    assert flight.stats()["timeouts"] == 2 and flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["executions"] == 2
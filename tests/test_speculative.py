@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app import SpeculativeAnalysis  # noqa: E402
+
+DOCS = ["청크 1", "청크 2"]
+PROMPT = "사업명을 알려주세요"
+
+
+class FakeGenerate:
+    """Stand-in for RFPAnalyzer.generate_from_documents that blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def __call__(self, documents, prompt):
+        self.calls.append((documents, prompt))
+        self.release.wait(5)
+        return f"{prompt}: {len(documents)}"
+
+
+@pytest.fixture
+def generate():
+    fake = FakeGenerate()
+    yield fake
+    fake.release.set()
+
+
+def test_same_request_returns_the_same_future(generate):
+    speculation = SpeculativeAnalysis(max_inflight=2)
+
+    first = speculation.start("s1", DOCS, PROMPT, generate)
+    second = speculation.start("s1", list(DOCS), PROMPT, generate)
+
+    assert first is second
+    assert speculation.stats["started"] == 1
+
+
+def test_changed_prompt_or_selection_discards_the_job(generate):
+    speculation = SpeculativeAnalysis(max_inflight=2)
+    speculation.start("s1", DOCS, PROMPT, generate)
+
+    # A new prompt replaces the owner's job
+    speculation.start("s1", DOCS, "다른 질문", generate)
+    assert speculation.stats["discarded"] == 1
+
+    # Claiming with another selection drops it as well
+    assert speculation.claim("s1", DOCS[:1], "다른 질문") is None
+    assert speculation.stats["discarded"] == 2
+    assert speculation.claim("s1", DOCS[:1], "다른 질문") is None
+
+
+def test_cap_skips_new_jobs(generate):
+    speculation = SpeculativeAnalysis(max_inflight=1)
+    assert speculation.start("s1", DOCS, PROMPT, generate) is not None
+
+    assert speculation.start("s2", DOCS, PROMPT, generate) is None
+    assert speculation.stats["skipped"] == 1
+
+    generate.release.set()
+    speculation.claim("s1", DOCS, PROMPT).result(5)
+    assert speculation.start("s2", DOCS, PROMPT, generate) is not None
+
+
+def test_claim_picks_up_an_in_flight_job(generate):
+    speculation = SpeculativeAnalysis(max_inflight=2)
+    started = speculation.start("s1", DOCS, PROMPT, generate)
+
+    claimed = speculation.claim("s1", DOCS, PROMPT)
+    assert claimed is started and not claimed.done()
+
+    generate.release.set()
+    assert claimed.result(5) == f"{PROMPT}: 2"
+    assert speculation.stats["hits"] == 1
+    assert generate.calls == [(DOCS, PROMPT)]
+
+
+def test_finished_unclaimed_jobs_expire(generate):
+    speculation = SpeculativeAnalysis(max_inflight=2, ttl=0)
+    generate.release.set()
+    speculation.start("s1", DOCS, PROMPT, generate).result(5)
+
+    # Any later start prunes expired results
+    speculation.start("s2", DOCS, PROMPT, generate).result(5)
+
+    assert speculation.claim("s1", DOCS, PROMPT) is None
+    assert speculation.stats["discarded"] == 0
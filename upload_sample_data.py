@@ -9,13 +9,6 @@ AZURE_SEARCH_API_KEY = os.getenv("AZURE_SEARCH_API_KEY")
 AZURE_SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
 INDEX_NAME = "rfp-syryu-obj"
 
-# Initialize the search client
-search_client = SearchClient(
-    endpoint=AZURE_SEARCH_ENDPOINT,
-    index_name=INDEX_NAME,
-    credential=AzureKeyCredential(AZURE_SEARCH_API_KEY)
-)
-
 # Sample RFP document
 sample_doc = {
     "id": "RFP001",
@@ -37,12 +30,34 @@ sample_doc = {
     "skillsets": ["Python", "Azure", "PKI", "OAuth 2.0"],
     "importance": 0.85,
     "analysisNotes": "디지털 전환 핵심 프로젝트",
-    "constraints": "금융보안 규정 준수 필수, 감사 추적 기능 필수"
+    "constraints": "금융보안 규정 준수 필수, 감사 추적 기능 필수",
+    # Requirement-level records (normally produced by requirement_index.py ingest)
+    "requirements": [
+        {"reqId": "SFR-001", "reqType": "functional", "category": "전자계약",
+         "text": "전자계약 생성 및 관리, 계약서 템플릿 관리, 계약 이력 관리", "priority": 3,
+         "sourcePage": 12, "relatedReqIds": ["SFR-002"]},
+        {"reqId": "SFR-002", "reqType": "functional", "category": "전자계약",
+         "text": "계약 승인 워크플로우", "priority": 2, "sourcePage": 13, "relatedReqIds": ["SFR-001"]},
+        {"reqId": "SER-001", "reqType": "security", "category": "보안",
+         "text": "PKI 기반 전자서명, OAuth 2.0 인증, 감사 추적 기능", "priority": 3,
+         "sourcePage": 21, "relatedReqIds": ["SFR-001"]},
+        {"reqId": "PER-001", "reqType": "performance", "category": "성능",
+         "text": "시스템 응답시간 3초 이내, 동시 사용자 1000명 지원", "priority": 2,
+         "sourcePage": 25, "relatedReqIds": []},
+    ]
 }
 
-try:
-    result = search_client.upload_documents([sample_doc])
-    print(f"Uploaded {len(result)} documents")
-    print("Upload completed successfully")
-except Exception as e:
-    print(f"Error during upload: {str(e)}")
\ No newline at end of file
+if __name__ == "__main__":
+    # Initialize the search client
+    search_client = SearchClient(
+        endpoint=AZURE_SEARCH_ENDPOINT,
+        index_name=INDEX_NAME,
+        credential=AzureKeyCredential(AZURE_SEARCH_API_KEY)
+    )
+
+    try:
+        result = search_client.upload_documents([sample_doc])
+        print(f"Uploaded {len(result)} documents")
+        print("Upload completed successfully")
+    except Exception as e:
+        print(f"Error during upload: {str(e)}")